@@ -1,23 +1,27 @@
 
 import math
+import time
+import asyncio
 import logging
 import hashlib
+import threading
 from langchain_core.documents import Document
 
 from Backend.models.prompts import FACTUAL_QA_PROMPT
-from Backend.database.qdrant_client import get_qdrant_client
+from Backend.database.qdrant_client import get_qdrant_client, get_async_qdrant_client
 from qdrant_client.models import (
     QueryRequest, VectorInput, SparseVector, 
     Prefetch, Filter, FieldCondition, MatchValue,  PayloadSchemaType,FusionQuery,
     Fusion,
 )
-from Backend.notes.text.model import batch_chain
 from Backend.embedding.embed_local import embed_string_small
-from Backend.ingestion.extraction import enhance_text_query
+from Backend.embedding.inference import aembed_string_small
+from Backend.ingestion.extraction import aenhance_text_query
+from Backend.chat.expansion_gate import expansion_decision, known_paper_vocabulary, paper_vocabulary, record_decision
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 from langchain_groq import ChatGroq
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict
 
 # ----------------------------
 # Logging Configuration
@@ -28,15 +32,66 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# ----------------------------
-# Qdrant Client - Centralized
-# ----------------------------
-try:
-    client = get_qdrant_client()
-    logger.info("Connected to Qdrant successfully")
-except Exception as e:
-    logger.exception("Failed to connect to Qdrant")
-    raise e
+
+# Payload fields consumed by the Document builder below (never the image blob)
+CHAT_PAYLOAD_FIELDS = ["page_content", "pdf_id", "pdf_url", "chunk_id", "section", "source", "type"]
+
+def _pdf_query(query_embedding: dict, pdf_id: str, collection_name: str, k: int) -> dict:
+    """query_points keyword arguments for a hybrid search restricted to one PDF."""
+    # Create filter for this PDF only
+    pdf_filter = Filter(
+        must=[
+            FieldCondition(
+                key="pdf_id",
+                match=MatchValue(value=pdf_id)
+            )
+        ]
+    )
+
+    return dict(
+        collection_name=collection_name,
+        prefetch=[
+            Prefetch(
+                query=query_embedding["dense_embedding"],
+                using="dense",
+                limit=k,
+                filter=pdf_filter  # ← Only this PDF
+            ),
+            Prefetch(
+                query=SparseVector(
+                    indices=query_embedding["sparse_embedding"]["indices"],
+                    values=query_embedding["sparse_embedding"]["values"]
+                ),
+                using="sparse",
+                limit=k,
+                filter=pdf_filter  # ← Only this PDF
+            )
+        ],
+        query=FusionQuery(fusion=Fusion.RRF), #This query takes object not dict 
+        limit=k,
+        with_payload=CHAT_PAYLOAD_FIELDS
+    )
+
+
+def _points_to_documents(points) -> list:
+    """Convert Qdrant points to LangChain Document format."""
+    documents = []
+    for point in points:
+        payload = point.payload or {}
+        doc = Document(
+            page_content=payload.get("page_content", ""),
+            metadata={
+                "pdf_id": payload.get("pdf_id"),
+                "pdf_url": payload.get("pdf_url"),
+                "chunk_id": payload.get("chunk_id"),
+                "section": payload.get("section"),
+                "source": payload.get("source"),
+                "type": payload.get("type")
+            }
+        )
+        documents.append(doc)
+    return documents
+
 
 def hybrid_search_for_pdf(query: str, pdf_id: str, collection_name: str, k: int = 100):
     """
@@ -49,56 +104,9 @@ def hybrid_search_for_pdf(query: str, pdf_id: str, collection_name: str, k: int
         # Get hybrid embeddings for query
         query_embedding = embed_string_small(query)
         
-        # Create filter for this PDF only
-        pdf_filter = Filter(
-            must=[
-                FieldCondition(
-                    key="pdf_id",
-                    match=MatchValue(value=pdf_id)
-                )
-            ]
-        )
-        
         # Perform hybrid search with filter
-        search_results = client.query_points(
-            collection_name=collection_name,
-            prefetch=[
-                Prefetch(
-                    query=query_embedding["dense_embedding"],
-                    using="dense",
-                    limit=k,
-                    filter=pdf_filter  # ← Only this PDF
-                ),
-                Prefetch(
-                    query=SparseVector(
-                        indices=query_embedding["sparse_embedding"]["indices"],
-                        values=query_embedding["sparse_embedding"]["values"]
-                    ),
-                    using="sparse",
-                    limit=k,
-                    filter=pdf_filter  # ← Only this PDF
-                )
-            ],
-            query=FusionQuery(fusion=Fusion.RRF), #This query takes object not dict 
-            limit=k
-        )
-        
-        # Convert to LangChain Document format
-        documents = []
-        for point in search_results.points:
-            payload = point.payload or {}
-            doc = Document(
-                page_content=payload.get("page_content", ""),
-                metadata={
-                    "pdf_id": payload.get("pdf_id"),
-                    "pdf_url": payload.get("pdf_url"),
-                    "chunk_id": payload.get("chunk_id"),
-                    "section": payload.get("section"),
-                    "source": payload.get("source"),
-                    "type": payload.get("type")
-                }
-            )
-            documents.append(doc)
+        search_results = get_qdrant_client().query_points(**_pdf_query(query_embedding, pdf_id, collection_name, k))
+        documents = _points_to_documents(search_results.points)
         
         logger.info(f"✅ Found {len(documents)} chunks for PDF ID: {pdf_id}")
         return documents
@@ -106,10 +114,59 @@ def hybrid_search_for_pdf(query: str, pdf_id: str, collection_name: str, k: int
     except Exception as e:
         logger.exception(f"Hybrid search failed for PDF ID: {pdf_id}")
         return []
+
+
+async def ahybrid_search_for_pdf(query: str, pdf_id: str, collection_name: str, k: int = 100, timings: dict = None):
+    """
+    Async variant of hybrid_search_for_pdf for request handlers.
+    The embedding runs on the micro-batched inference executor and the Qdrant
+    round trip uses the async client, so the event loop keeps serving other
+    requests meanwhile. Stage durations (ms) go into timings as "embed" / "retrieve".
+    """
+    timings = timings if timings is not None else {}
+    try:
+        logger.info(f"Hybrid search for PDF ID: {pdf_id}")
+
+        start = time.perf_counter()
+        query_embedding = await aembed_string_small(query)
+        timings["embed"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        search_results = await get_async_qdrant_client().query_points(
+            **_pdf_query(query_embedding, pdf_id, collection_name, k)
+        )
+        timings["retrieve"] = (time.perf_counter() - start) * 1000
+        documents = _points_to_documents(search_results.points)
+
+        logger.info(f"✅ Found {len(documents)} chunks for PDF ID: {pdf_id}")
+        return documents
+
+    except Exception as e:
+        logger.exception(f"Hybrid search failed for PDF ID: {pdf_id}")
+        return []
     
 #------------------------------------
 # CALLING LLM WITH STREAM RESPONSE
 #-----------------------------------
+_streaming_llms: Dict[tuple, ChatGroq] = {}
+_streaming_llms_lock = threading.Lock()
+
+
+def _get_streaming_llm(model_name: str, temperature: float, max_tokens: int | None) -> ChatGroq:
+    """One streaming ChatGroq per configuration, reused by every message (and its HTTP connections)."""
+    key = (model_name, temperature, max_tokens)
+    with _streaming_llms_lock:
+        model = _streaming_llms.get(key)
+        if model is None:
+            model = _streaming_llms[key] = ChatGroq(
+                temperature=temperature,
+                model=model_name,
+                max_tokens=max_tokens,
+                streaming=True
+            )
+        return model
+
+
 async def groq_llm_stream(
     text,
     MODEL_NAME: str,
@@ -121,12 +178,7 @@ async def groq_llm_stream(
     if text is None:
         return  # ✅ just exit, not return ""
 
-    model = ChatGroq(
-        temperature=temperature,
-        model=MODEL_NAME,
-        max_tokens=max_token,
-        streaming=True
-    )
+    model = _get_streaming_llm(MODEL_NAME, temperature, max_token)
 
     chain = prompt_template | model
 
@@ -150,25 +202,93 @@ async def groq_llm_stream(
 #-----------------------
 #  QA_CHAIN
 #-----------------------
+CHAT_MODEL_NAME = "llama-3.3-70b-versatile"
+CHAT_TEMPERATURE = 0.3
+
+
+async def _expand_question(user_query: str, timings: dict) -> str:
+    start = time.perf_counter()
+    try:
+        return (await aenhance_text_query(user_query))["enhanced_text"] or user_query
+    except Exception as e:
+        logger.warning(f"⚠️ Chat query expansion failed, using the message as is: {e}")
+        return user_query
+    finally:
+        timings["expand"] = (time.perf_counter() - start) * 1000
+
+
+async def prepare_answer(user_query: str, pdf_id: str, collection_name: str, k: int = 100) -> dict:
+    """
+    Everything an answer needs before the first token, run concurrently:
+    query embedding + retrieval, and the query expansion when it is worthwhile.
+
+    When the paper's vocabulary is not known yet (first message about a paper),
+    expansion starts speculatively alongside retrieval; if the retrieved chunks
+    then show the message is specific, the task is cancelled (the remote call
+    still finishes on its thread and fills the expansion cache). Returns
+    {"docs", "question", "decision", "timings"}; timings are per stage in ms.
+    """
+    timings: dict = {}
+    vocabulary = known_paper_vocabulary(pdf_id)
+    decision = expansion_decision(user_query, vocabulary)
+
+    expansion = None
+    if decision["expand"]:
+        expansion = asyncio.create_task(_expand_question(user_query, timings))  # never raises
+
+    try:
+        docs = await ahybrid_search_for_pdf(user_query, pdf_id, collection_name, k, timings=timings)
+
+        if vocabulary is None and docs:
+            decision = expansion_decision(user_query, paper_vocabulary(pdf_id, (doc.page_content for doc in docs)))
+        record_decision(decision)
+
+        question = user_query
+        if decision["expand"]:
+            start = time.perf_counter()
+            question = await (expansion or _expand_question(user_query, timings))
+            # only the part not hidden behind retrieval delays the first token
+            timings["expand_wait"] = (time.perf_counter() - start) * 1000
+    finally:
+        if expansion is not None and not expansion.done():
+            # not needed (skipped, or retrieval failed): never leave it running unowned
+            expansion.cancel()
+            await asyncio.gather(expansion, return_exceptions=True)
+            timings.pop("expand", None)
+
+    return {"docs": docs, "question": question, "decision": decision, "timings": timings}
+
+
 async def qa_chain(
     user_query: str,
     retrieved_docs: list,
+    pdf_id: str = None,
+    question: str = None,
 ) -> AsyncGenerator[str, None]:
+    """
+    Stream an answer grounded in retrieved_docs.
+    question is the (possibly expanded) question from prepare_answer; without it
+    the expansion gate decides here (pdf_id enables the paper-vocabulary check).
+    """
 
     context = "\n".join(
         f"[Source {i+1}]\n{doc.page_content}"
         for i, doc in enumerate(retrieved_docs)
     )
 
-    query = enhance_text_query(user_input=user_query)
+    if question is None:
+        vocabulary = paper_vocabulary(pdf_id, (doc.page_content for doc in retrieved_docs)) if pdf_id else None
+        decision = expansion_decision(user_query, vocabulary)
+        record_decision(decision)
+        question = await _expand_question(user_query, {}) if decision["expand"] else user_query
 
     async for token in groq_llm_stream(
         text={
             "context": context,
-            "question": query["enhanced_text"]
+            "question": question
         },
-        MODEL_NAME="llama-3.3-70b-versatile",
-        temperature=0.3,
+        MODEL_NAME=CHAT_MODEL_NAME,
+        temperature=CHAT_TEMPERATURE,
         max_token=None,
         prompt_template=FACTUAL_QA_PROMPT,
     ):
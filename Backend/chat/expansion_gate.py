@@ -0,0 +1,107 @@
+"""
+Decides per chat message whether query expansion is worth its remote LLM call.
+
+Expansion helps short or vague questions; a message that is already specific
+to the paper ("how is the KL term weighted in eq. 4?") gains little and costs
+a full round trip before the first token. Features, all local:
+- content terms: how many non-stopword terms the message has, including the
+  short acronyms and numbers ("KL", "F1", "eq. 4") the search tokenizer drops
+- technical density: share of terms that are acronyms, contain digits or hyphens
+- paper overlap: share of terms that occur in the paper's own stored chunks
+
+A short message is expanded unless it has a technical term and the paper
+overlap or technical density shows it is specific anyway.
+"""
+import os
+import re
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from Backend.search.lexical_expansion import tokenize
+from Backend.utils.cache import LRUCache
+from Backend.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# "auto" (classifier), "always" or "never"
+CHAT_EXPANSION_MODE = os.getenv("CHAT_EXPANSION_MODE", "auto").lower()
+MIN_SPECIFIC_TERMS = 3        # fewer content terms than this is expanded unless one is technical
+MIN_PAPER_OVERLAP = 0.6       # share of terms found in the paper to count as specific
+MIN_TECHNICAL_DENSITY = 0.5   # ... or this technical with at least half the overlap
+
+_WORD = re.compile(r"[A-Za-z0-9][\w\-]*")
+_TECHNICAL_TOKEN = re.compile(r"^(?:[A-Z][A-Z0-9]{1,}s?|.*\d.*|.+-.+)$")
+
+_vocabularies = LRUCache(max_items=int(os.getenv("CHAT_VOCABULARY_CACHE_ITEMS", "128")))
+
+
+def gate_terms(text: str) -> List[Tuple[str, str]]:
+    """(raw word, term) pairs: tokenize's terms plus the acronyms and numbers it drops."""
+    pairs = []
+    for word in _WORD.findall(text or ""):
+        if _TECHNICAL_TOKEN.match(word):
+            pairs.append((word, word.lower()))
+        else:
+            pairs.extend((word, term) for term in tokenize(word))
+    return pairs
+
+
+def paper_vocabulary(pdf_id: str, chunks: Iterable[str]) -> Set[str]:
+    """
+    Term set of a paper, built from its chunks the first time and kept per pdf_id.
+    Callers pass the chunks they already retrieved for the message (up to 100 of
+    the paper's), so this never costs another Qdrant round trip.
+    """
+    vocabulary = _vocabularies.get(pdf_id)
+    if vocabulary is None:
+        vocabulary = set()
+        for text in chunks:
+            vocabulary.update(tokenize(text))
+            vocabulary.update(w.lower() for w in _WORD.findall(text) if _TECHNICAL_TOKEN.match(w))
+        _vocabularies.put(pdf_id, vocabulary)
+    return vocabulary
+
+
+def known_paper_vocabulary(pdf_id: str) -> Optional[Set[str]]:
+    """The cached term set of a paper, or None before its first message."""
+    return _vocabularies.get(pdf_id) if pdf_id else None
+
+
+def expansion_decision(message: str, vocabulary: Optional[Set[str]] = None) -> Dict:
+    """{"expand": bool, "reason": str, "terms", "technical_density", "paper_overlap"}"""
+    pairs = gate_terms(message)
+    terms = [term for _, term in pairs]
+    technical = sum(bool(_TECHNICAL_TOKEN.match(word)) for word, _ in pairs)
+    decision = {
+        "terms": len(terms),
+        "technical_density": round(technical / len(terms), 3) if terms else 0.0,
+        "paper_overlap": round(sum(t in vocabulary for t in terms) / len(terms), 3) if terms and vocabulary else 0.0,
+    }
+
+    if CHAT_EXPANSION_MODE in ("always", "never"):
+        return {**decision, "expand": CHAT_EXPANSION_MODE == "always", "reason": CHAT_EXPANSION_MODE}
+    # "explain the method" is short and vague; "what is KL?" is short but precise
+    if decision["terms"] < MIN_SPECIFIC_TERMS and not technical:
+        return {**decision, "expand": True, "reason": "short"}
+    if decision["paper_overlap"] >= MIN_PAPER_OVERLAP:
+        return {**decision, "expand": False, "reason": "paper_vocabulary"}
+    if decision["technical_density"] >= MIN_TECHNICAL_DENSITY and decision["paper_overlap"] >= MIN_PAPER_OVERLAP / 2:
+        return {**decision, "expand": False, "reason": "technical"}
+    if decision["terms"] < MIN_SPECIFIC_TERMS:
+        return {**decision, "expand": True, "reason": "short"}
+    return {**decision, "expand": True, "reason": "vague"}
+
+
+def record_decision(decision: Dict) -> None:
+    """Count the decision; a skip is credited with the recent mean expansion latency."""
+    metrics = get_metrics()
+    metrics.observe("chat.expansion.expanded", 1.0 if decision["expand"] else 0.0)
+    if not decision["expand"]:
+        saved_ms = metrics.mean("expansion.remote_ms")
+        if saved_ms is not None:
+            metrics.observe("chat.expansion.saved_ms", saved_ms)
+    logger.info(
+        f"{'🔎 Expanding' if decision['expand'] else '⏩ Skipping expansion of'} chat message "
+        f"({decision['reason']}: terms={decision['terms']}, technical={decision['technical_density']}, "
+        f"overlap={decision['paper_overlap']})"
+    )
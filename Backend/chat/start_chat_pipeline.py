@@ -12,7 +12,6 @@ from qdrant_client.models import (
     Prefetch, Filter, FieldCondition, MatchValue,  PayloadSchemaType,FusionQuery,
     Fusion,
 )
-from Backend.notes.text.model import batch_chain, final_chain
 from Backend.embedding.embed_local import embed_string_small
 
 logging.basicConfig(
@@ -21,15 +20,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# ----------------------------
-# Qdrant Client - Centralized
-# ----------------------------
-try:
-    client = get_qdrant_client()
-    logger.info("Connected to Qdrant successfully")
-except Exception as e:
-    logger.exception("Failed to connect to Qdrant")
-    raise e
 
 
 # ----------------------------
@@ -43,7 +33,7 @@ def ensure_collection_exists(pdf_url: str, collection_name: str):
         pdf_id = generate_pdf_id(pdf_url)
         
         # Check if collection exists
-        collections = client.get_collections().collections
+        collections = get_qdrant_client().get_collections().collections
         existing = [c.name for c in collections]
 
         if collection_name not in existing:
@@ -59,14 +49,14 @@ def ensure_collection_exists(pdf_url: str, collection_name: str):
 
         # Collection exists - check if this PDF is already embedded
         
-        client.create_payload_index(
+        get_qdrant_client().create_payload_index(
                     collection_name=collection_name,
                     field_name="pdf_id",
                     field_schema=PayloadSchemaType.KEYWORD
         )
-        collection_info = client.get_collection(collection_name)
+        collection_info = get_qdrant_client().get_collection(collection_name)
         # Try to find points with this pdf_id
-        search_result = client.scroll(
+        search_result = get_qdrant_client().scroll(
             collection_name=collection_name,
             scroll_filter=Filter(
                 must=[
@@ -76,7 +66,8 @@ def ensure_collection_exists(pdf_url: str, collection_name: str):
                     )
                 ]
             ),
-            limit=1
+            limit=1,
+            with_payload=False  # existence check only
         )
         points, _ = search_result
         if len(points) > 0:  # Points found for this PDF
@@ -0,0 +1,94 @@
+"""
+Content-addressed blob store for figure/table images.
+Images live on the local filesystem keyed by the SHA-256 of their bytes;
+Qdrant payloads only keep that hash (image_ref).
+"""
+import os
+import re
+import base64
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", os.path.join(BASE_DIR, "blobs"))
+
+_REF_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def is_valid_ref(ref: str) -> bool:
+    return bool(ref) and bool(_REF_PATTERN.match(ref))
+
+
+class BlobStore:
+    """Filesystem blob store: <root>/<first 2 hex chars>/<sha256>."""
+
+    def __init__(self, root: str = BLOB_STORE_DIR):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, ref: str) -> str:
+        if not is_valid_ref(ref):
+            raise ValueError(f"Invalid blob reference: {ref!r}")
+        return os.path.join(self.root, ref[:2], ref)
+
+    def put(self, data: bytes) -> str:
+        """Store bytes (idempotent) and return their SHA-256 reference."""
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref)
+        if os.path.exists(path):
+            return ref
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write-then-rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return ref
+
+    def get(self, ref: str) -> Optional[bytes]:
+        try:
+            with open(self._path(ref), "rb") as f:
+                return f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put_base64(self, b64: str) -> str:
+        return self.put(base64.b64decode(b64))
+
+    def get_base64(self, ref: str) -> Optional[str]:
+        data = self.get(ref)
+        return base64.b64encode(data).decode("ascii") if data is not None else None
+
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Get or create the blob store instance (singleton pattern)."""
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore()
+            logger.info(f"✅ Blob store at {_blob_store.root}")
+        return _blob_store
+
+
+def guess_image_media_type(data: bytes) -> str:
+    """Media type from magic bytes (extracted visuals are JPEG or PNG)."""
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"GIF8"):
+        return "image/gif"
+    return "image/jpeg"
@@ -0,0 +1,135 @@
+"""
+Push-based job updates for the API process.
+
+One background task follows the job store's change feed and wakes the
+asyncio events of whoever is waiting on a changed job. Waiting requests
+(SSE streams, chat messages waiting for preparation) cost nothing until
+their job actually changes, and the store is read once per poll interval
+in total, not once per waiter.
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import AsyncGenerator, Callable, Dict, Optional, Set
+
+from Backend.database.job_store import JobStore, get_job_store
+
+logger = logging.getLogger(__name__)
+
+# How often the watcher reads the change feed while anyone is subscribed
+JOB_EVENTS_POLL_INTERVAL = float(os.getenv("JOB_EVENTS_POLL_INTERVAL", "0.25"))
+# SSE comment sent when nothing happened for this long (keeps proxies from closing the stream)
+SSE_HEARTBEAT_SECONDS = 15
+
+TERMINAL_STATUSES = {"done", "error", "not_found"}
+
+
+def is_terminal(state: Optional[dict]) -> bool:
+    return state is None or state.get("status") in TERMINAL_STATUSES
+
+
+class JobEventHub:
+    """Fans job store changes out to per-job asyncio events."""
+
+    def __init__(self, store: JobStore, poll_interval: float = JOB_EVENTS_POLL_INTERVAL):
+        self.store = store
+        self.poll_interval = poll_interval
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self, job_id: str) -> asyncio.Event:
+        event = asyncio.Event()
+        self._waiters.setdefault(job_id, set()).add(event)
+        return event
+
+    def unsubscribe(self, job_id: str, event: asyncio.Event):
+        waiters = self._waiters.get(job_id)
+        if waiters is not None:
+            waiters.discard(event)
+            if not waiters:
+                del self._waiters[job_id]
+
+    async def _watch(self):
+        cursor = await asyncio.to_thread(self.store.change_cursor)
+        while True:
+            try:
+                if self._waiters:
+                    cursor, job_ids = await asyncio.to_thread(self.store.changes_since, cursor)
+                    for job_id in set(job_ids):
+                        for event in self._waiters.get(job_id, ()):
+                            event.set()
+            except Exception as e:
+                logger.warning(f"⚠️ Job change feed read failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def wait_for(
+        self,
+        job_id: str,
+        predicate: Callable[[Optional[dict]], bool] = is_terminal,
+        timeout: Optional[float] = None,
+    ) -> Optional[dict]:
+        """
+        Wait until predicate(state) holds and return the state.
+        Raises asyncio.TimeoutError after timeout seconds.
+        """
+        event = self.subscribe(job_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                # subscribe first, then read: a change between the two still sets the event
+                event.clear()
+                state = await asyncio.to_thread(self.store.get, job_id)
+                if predicate(state):
+                    return state
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(event.wait(), remaining)
+        finally:
+            self.unsubscribe(job_id, event)
+
+    async def stream(self, job_id: str) -> AsyncGenerator[str, None]:
+        """Server-Sent Events: one `data:` frame per state change, ends on a terminal state."""
+        event = self.subscribe(job_id)
+        try:
+            while True:
+                event.clear()
+                state = await asyncio.to_thread(self.store.get, job_id)
+                state = state or {"status": "not_found"}
+                yield f"data: {json.dumps(state)}\n\n"
+                if is_terminal(state):
+                    return
+                while True:
+                    try:
+                        await asyncio.wait_for(event.wait(), SSE_HEARTBEAT_SECONDS)
+                        break
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(job_id, event)
+
+
+_job_event_hub: Optional[JobEventHub] = None
+
+
+def get_job_event_hub() -> JobEventHub:
+    """Get or create the hub (singleton pattern; only touched from the event loop)."""
+    global _job_event_hub
+    if _job_event_hub is None:
+        _job_event_hub = JobEventHub(get_job_store())
+    return _job_event_hub
@@ -0,0 +1,553 @@
+"""
+Job store for notes / chat preparation jobs.
+
+Replaces the module-level JOBS / CHAT_JOBS dicts so job state:
+- survives restarts
+- is visible to every uvicorn worker on the box
+- is evicted after a TTL instead of growing forever
+
+Each job has a kind ("notes", "chat") and a dedupe key (the paper's vector_index).
+At most one job per (kind, dedupe_key) is active at a time; creating a job while
+one is active returns the existing job id instead.
+
+A worker holds a claimed job under a lease (CLAIM_LEASE_SECONDS) that it renews
+while the job runs. A claim whose lease ran out belongs to a worker that died:
+the job is re-issued to the next worker, and an active job in that state no
+longer blocks creating a new one.
+
+The store also holds the work queue consumed by Backend.workers.runner, and a
+change feed (job ids in update order) that lets the API push updates instead
+of polling every job (see Backend/database/job_events.py).
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from collections import deque
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "sqlite")
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(BASE_DIR, "jobs.db"))
+# Finished / failed jobs are kept this long so clients can still read the result
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", str(24 * 3600)))
+# An active job that is not in the queue (so has no lease) is considered abandoned after this
+ACTIVE_JOB_TTL_SECONDS = int(os.getenv("ACTIVE_JOB_TTL_SECONDS", str(3600)))
+# A claim not renewed for this long belongs to a dead worker (see renew_claims)
+CLAIM_LEASE_SECONDS = int(os.getenv("CLAIM_LEASE_SECONDS", "60"))
+ABANDONED_JOB_ERROR = "The worker running this job stopped; please retry"
+EVICT_INTERVAL_SECONDS = 60
+# Change feed entries only need to outlive one watcher poll; keep a generous margin
+CHANGE_LOG_TTL_SECONDS = 600
+
+# Higher runs first: a user is waiting on chat preparation before they can type
+JOB_PRIORITIES = {"chat": 10, "notes": 0}
+
+
+def _is_live(now: float, started_at: float, queued: bool, claimed_at: Optional[float], active_ttl: int, lease: int) -> bool:
+    """Whether an active job is still waiting for or held by a worker."""
+    if not queued:
+        # not run through the queue: only its age can tell
+        return now - started_at < active_ttl
+    return claimed_at is None or now - claimed_at < lease
+
+
+class JobStore(ABC):
+    """Interface every job store backend implements."""
+
+    @abstractmethod
+    def create_or_get(
+        self,
+        kind: str,
+        dedupe_key: str,
+        state: Dict[str, Any],
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, bool]:
+        """
+        Atomically create a job unless a live one is already active for (kind, dedupe_key).
+        When payload is given, a new job is also queued for the workers
+        (priority from JOB_PRIORITIES) in the same step. An active job whose claim
+        lease ran out is failed with ABANDONED_JOB_ERROR and replaced.
+
+        Returns:
+            (job_id, created) - created is False when an active job was reused
+        """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job state dict, or None if unknown / evicted."""
+
+    @abstractmethod
+    def set_state(self, job_id: str, state: Dict[str, Any]) -> None:
+        """Replace the job state dict."""
+
+    @abstractmethod
+    def update_state(self, job_id: str, fields: Dict[str, Any]) -> None:
+        """Merge fields into the job state dict (read-modify-write, atomic)."""
+
+    @abstractmethod
+    def change_cursor(self) -> int:
+        """Position of the latest entry in the change feed."""
+
+    @abstractmethod
+    def changes_since(self, cursor: int) -> Tuple[int, List[str]]:
+        """
+        Job ids whose state changed after cursor.
+
+        Returns:
+            (new_cursor, job_ids)
+        """
+
+    @abstractmethod
+    def release(self, kind: str, dedupe_key: str) -> None:
+        """Mark (kind, dedupe_key) as no longer active, so the next request starts a new job."""
+
+    @abstractmethod
+    def evict_expired(self) -> int:
+        """Drop jobs past their TTL. Returns how many were removed."""
+
+    @abstractmethod
+    def claim_next(self, kinds: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Claim the highest-priority queued job (oldest first within a priority).
+        Claims whose lease ran out are treated as abandoned and re-issued.
+
+        Returns:
+            {"job_id", "kind", "payload", "enqueued_at"} or None when the queue is empty
+        """
+
+    @abstractmethod
+    def renew_claims(self, job_ids: List[str]) -> None:
+        """Extend the lease of claimed jobs that are still running."""
+
+    @abstractmethod
+    def unclaim(self, job_id: str) -> None:
+        """Give a claimed job back to the queue so the next worker picks it up right away."""
+
+    @abstractmethod
+    def complete(self, job_id: str) -> None:
+        """Remove a claimed job from the queue."""
+
+    @abstractmethod
+    def recent_timings(self, limit: int = 200) -> List[Dict[str, Any]]:
+        """
+        Stage timings of the most recently updated jobs that have any.
+
+        Returns:
+            [{"job_id", "kind", "timings"}], newest first
+        """
+
+
+class InMemoryJobStore(JobStore):
+    """Single-process backend (same behaviour as the old dicts, plus TTL)."""
+
+    def __init__(self, ttl: int = JOB_TTL_SECONDS, active_ttl: int = ACTIVE_JOB_TTL_SECONDS, lease: int = CLAIM_LEASE_SECONDS):
+        self.ttl = ttl
+        self.active_ttl = active_ttl
+        self.lease = lease
+        self._jobs: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._active: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._kinds: Dict[str, str] = {}
+        # job_id -> {"kind", "payload", "priority", "enqueued_at", "claimed_at"}
+        self._queue: Dict[str, Dict[str, Any]] = {}
+        # (seq, job_id) change feed; bounded, watchers only need recent entries
+        self._changes: deque = deque(maxlen=10000)
+        self._seq = 0
+        self._last_evict = 0.0
+        self._lock = threading.Lock()
+
+    def _record_change(self, job_id):
+        # caller holds self._lock
+        self._seq += 1
+        self._changes.append((self._seq, job_id))
+
+    def _live(self, job_id, started_at, now):
+        # caller holds self._lock
+        entry = self._queue.get(job_id)
+        return _is_live(now, started_at, entry is not None, entry and entry["claimed_at"], self.active_ttl, self.lease)
+
+    def create_or_get(self, kind, dedupe_key, state, payload=None):
+        self._maybe_evict()
+        now = time.time()
+        with self._lock:
+            active = self._active.get((kind, dedupe_key))
+            if active and active[0] in self._jobs:
+                if self._live(active[0], active[1], now):
+                    return active[0], False
+                if self._queue.pop(active[0], None) is not None:
+                    state = {**self._jobs[active[0]][0], "status": "error", "error": ABANDONED_JOB_ERROR}
+                    self._jobs[active[0]] = (state, now)
+                    self._record_change(active[0])
+            job_id = str(uuid.uuid4())
+            self._jobs[job_id] = (dict(state), now)
+            self._kinds[job_id] = kind
+            self._active[(kind, dedupe_key)] = (job_id, now)
+            if payload is not None:
+                self._queue[job_id] = {
+                    "kind": kind,
+                    "payload": dict(payload),
+                    "priority": JOB_PRIORITIES.get(kind, 0),
+                    "enqueued_at": now,
+                    "claimed_at": None,
+                }
+            return job_id, True
+
+    def get(self, job_id):
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            return dict(entry[0]) if entry else None
+
+    def set_state(self, job_id, state):
+        self._maybe_evict()
+        with self._lock:
+            self._jobs[job_id] = (dict(state), time.time())
+            self._record_change(job_id)
+
+    def update_state(self, job_id, fields):
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            state = dict(entry[0]) if entry else {}
+            state.update(fields)
+            self._jobs[job_id] = (state, time.time())
+            self._record_change(job_id)
+
+    def change_cursor(self):
+        with self._lock:
+            return self._seq
+
+    def changes_since(self, cursor):
+        with self._lock:
+            job_ids = [job_id for seq, job_id in self._changes if seq > cursor]
+            return self._seq, job_ids
+
+    def release(self, kind, dedupe_key):
+        with self._lock:
+            self._active.pop((kind, dedupe_key), None)
+
+    def evict_expired(self):
+        now = time.time()
+        cutoff = now - self.ttl
+        with self._lock:
+            expired = [job_id for job_id, (_, updated) in self._jobs.items() if updated < cutoff]
+            for job_id in expired:
+                self._jobs.pop(job_id, None)
+                self._kinds.pop(job_id, None)
+            # dedupe entries whose job is gone or that create_or_get would no longer honour
+            stale = [
+                key for key, (job_id, created) in self._active.items()
+                if job_id not in self._jobs or not self._live(job_id, created, now)
+            ]
+            for key in stale:
+                self._active.pop(key, None)
+            return len(expired)
+
+    def _maybe_evict(self):
+        # called outside self._lock: evict_expired takes it
+        now = time.time()
+        if now - self._last_evict >= EVICT_INTERVAL_SECONDS:
+            self._last_evict = now
+            self.evict_expired()
+
+    def claim_next(self, kinds=None):
+        now = time.time()
+        with self._lock:
+            candidates = [
+                (job_id, entry) for job_id, entry in self._queue.items()
+                if (entry["claimed_at"] is None or now - entry["claimed_at"] >= self.lease)
+                and (kinds is None or entry["kind"] in kinds)
+            ]
+            if not candidates:
+                return None
+            job_id, entry = min(candidates, key=lambda c: (-c[1]["priority"], c[1]["enqueued_at"]))
+            entry["claimed_at"] = now
+            return {
+                "job_id": job_id,
+                "kind": entry["kind"],
+                "payload": dict(entry["payload"]),
+                "enqueued_at": entry["enqueued_at"],
+            }
+
+    def renew_claims(self, job_ids):
+        now = time.time()
+        with self._lock:
+            for job_id in job_ids:
+                entry = self._queue.get(job_id)
+                if entry is not None and entry["claimed_at"] is not None:
+                    entry["claimed_at"] = now
+
+    def unclaim(self, job_id):
+        with self._lock:
+            entry = self._queue.get(job_id)
+            if entry is not None:
+                entry["claimed_at"] = None
+
+    def complete(self, job_id):
+        with self._lock:
+            self._queue.pop(job_id, None)
+
+    def recent_timings(self, limit=200):
+        with self._lock:
+            jobs = sorted(self._jobs.items(), key=lambda item: item[1][1], reverse=True)
+            return [
+                {"job_id": job_id, "kind": self._kinds.get(job_id, "unknown"), "timings": dict(state["timings"])}
+                for job_id, (state, _) in jobs
+                if state.get("timings")
+            ][:limit]
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite (WAL) backend shared by every process using the same file.
+    Dedupe is atomic across processes: the active-job check and insert run
+    inside one BEGIN IMMEDIATE transaction.
+    """
+
+    def __init__(
+        self,
+        path: str = JOB_STORE_PATH,
+        ttl: int = JOB_TTL_SECONDS,
+        active_ttl: int = ACTIVE_JOB_TTL_SECONDS,
+        lease: int = CLAIM_LEASE_SECONDS,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.active_ttl = active_ttl
+        self.lease = lease
+        self._local = threading.local()
+        self._last_evict = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                dedupe_key TEXT NOT NULL,
+                state TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs (updated_at);
+            CREATE TABLE IF NOT EXISTS active_jobs (
+                kind TEXT NOT NULL,
+                dedupe_key TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                PRIMARY KEY (kind, dedupe_key)
+            );
+            CREATE TABLE IF NOT EXISTS job_queue (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                enqueued_at REAL NOT NULL,
+                claimed_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_queue_order ON job_queue (priority DESC, enqueued_at);
+            CREATE TABLE IF NOT EXISTS job_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                changed_at REAL NOT NULL
+            );
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread; autocommit mode, transactions are explicit
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create_or_get(self, kind, dedupe_key, state, payload=None):
+        self._maybe_evict()
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                """SELECT a.job_id, a.started_at, q.job_id IS NOT NULL, q.claimed_at, j.state FROM active_jobs a
+                   JOIN jobs j ON j.job_id = a.job_id
+                   LEFT JOIN job_queue q ON q.job_id = a.job_id
+                   WHERE a.kind = ? AND a.dedupe_key = ?""",
+                (kind, dedupe_key),
+            ).fetchone()
+            if row:
+                active_id, started_at, queued, claimed_at, active_state = row
+                if _is_live(now, started_at, bool(queued), claimed_at, self.active_ttl, self.lease):
+                    conn.execute("COMMIT")
+                    return active_id, False
+                if queued:
+                    conn.execute("DELETE FROM job_queue WHERE job_id = ?", (active_id,))
+                    state_update = {**json.loads(active_state), "status": "error", "error": ABANDONED_JOB_ERROR}
+                    self._write_state(conn, active_id, state_update)
+
+            job_id = str(uuid.uuid4())
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, dedupe_key, state, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, dedupe_key, json.dumps(state), now, now),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO active_jobs (kind, dedupe_key, job_id, started_at) VALUES (?, ?, ?, ?)",
+                (kind, dedupe_key, job_id, now),
+            )
+            if payload is not None:
+                conn.execute(
+                    "INSERT INTO job_queue (job_id, kind, payload, priority, enqueued_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, kind, json.dumps(payload), JOB_PRIORITIES.get(kind, 0), now),
+                )
+            conn.execute("COMMIT")
+            return job_id, True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, job_id):
+        row = self._conn().execute("SELECT state FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_state(self, job_id, state):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_state(conn, job_id, state)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def update_state(self, job_id, fields):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT state FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            state = json.loads(row[0]) if row else {}
+            state.update(fields)
+            self._write_state(conn, job_id, state)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _write_state(conn, job_id, state):
+        now = time.time()
+        conn.execute(
+            "UPDATE jobs SET state = ?, updated_at = ? WHERE job_id = ?",
+            (json.dumps(state), now, job_id),
+        )
+        conn.execute("INSERT INTO job_changes (job_id, changed_at) VALUES (?, ?)", (job_id, now))
+
+    def change_cursor(self):
+        row = self._conn().execute("SELECT MAX(seq) FROM job_changes").fetchone()
+        return row[0] or 0
+
+    def changes_since(self, cursor):
+        rows = self._conn().execute(
+            "SELECT seq, job_id FROM job_changes WHERE seq > ? ORDER BY seq", (cursor,)
+        ).fetchall()
+        if not rows:
+            return cursor, []
+        return rows[-1][0], [job_id for _, job_id in rows]
+
+    def release(self, kind, dedupe_key):
+        self._conn().execute(
+            "DELETE FROM active_jobs WHERE kind = ? AND dedupe_key = ?",
+            (kind, dedupe_key),
+        )
+
+    def evict_expired(self):
+        cutoff = time.time() - self.ttl
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM jobs WHERE updated_at < ?", (cutoff,)).rowcount
+        conn.execute("DELETE FROM active_jobs WHERE job_id NOT IN (SELECT job_id FROM jobs)")
+        conn.execute("DELETE FROM job_changes WHERE changed_at < ?", (time.time() - CHANGE_LOG_TTL_SECONDS,))
+        if removed:
+            logger.info(f"🧹 Evicted {removed} expired jobs")
+        return removed
+
+    def claim_next(self, kinds=None):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            sql = "SELECT job_id, kind, payload, enqueued_at FROM job_queue WHERE (claimed_at IS NULL OR claimed_at < ?)"
+            params: list = [now - self.lease]
+            if kinds:
+                sql += f" AND kind IN ({','.join('?' * len(kinds))})"
+                params.extend(kinds)
+            sql += " ORDER BY priority DESC, enqueued_at LIMIT 1"
+            row = conn.execute(sql, params).fetchone()
+            if row:
+                conn.execute("UPDATE job_queue SET claimed_at = ? WHERE job_id = ?", (now, row[0]))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if not row:
+            return None
+        return {"job_id": row[0], "kind": row[1], "payload": json.loads(row[2]), "enqueued_at": row[3]}
+
+    def renew_claims(self, job_ids):
+        if not job_ids:
+            return
+        self._conn().execute(
+            f"UPDATE job_queue SET claimed_at = ? WHERE claimed_at IS NOT NULL AND job_id IN ({','.join('?' * len(job_ids))})",
+            (time.time(), *job_ids),
+        )
+
+    def unclaim(self, job_id):
+        self._conn().execute("UPDATE job_queue SET claimed_at = NULL WHERE job_id = ?", (job_id,))
+
+    def complete(self, job_id):
+        self._conn().execute("DELETE FROM job_queue WHERE job_id = ?", (job_id,))
+
+    def recent_timings(self, limit=200):
+        # json_extract keeps the (large) notes results out of the read
+        rows = self._conn().execute(
+            """SELECT job_id, kind, json_extract(state, '$.timings') FROM jobs
+               WHERE json_extract(state, '$.timings') IS NOT NULL
+               ORDER BY updated_at DESC LIMIT ?""",
+            (limit,),
+        ).fetchall()
+        return [{"job_id": job_id, "kind": kind, "timings": json.loads(timings)} for job_id, kind, timings in rows]
+
+    def _maybe_evict(self):
+        now = time.time()
+        if now - self._last_evict >= EVICT_INTERVAL_SECONDS:
+            self._last_evict = now
+            try:
+                self.evict_expired()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Job eviction failed: {e}")
+
+
+_job_store: Optional[JobStore] = None
+_job_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """
+    Get or create the job store (singleton pattern).
+    Backend is chosen by JOB_STORE_BACKEND ("sqlite" or "memory").
+    """
+    global _job_store
+    with _job_store_lock:
+        if _job_store is None:
+            if JOB_STORE_BACKEND == "memory":
+                _job_store = InMemoryJobStore()
+            elif JOB_STORE_BACKEND == "sqlite":
+                _job_store = SQLiteJobStore()
+            else:
+                raise ValueError(f"Unknown JOB_STORE_BACKEND: {JOB_STORE_BACKEND}")
+            logger.info(f"✅ Job store backend: {JOB_STORE_BACKEND}")
+        return _job_store
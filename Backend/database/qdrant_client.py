@@ -1,11 +1,15 @@
 """
 Centralized Qdrant client configuration.
-This module provides a singleton Qdrant client instance to avoid redundant connections.
+This module provides singleton Qdrant client instances to avoid redundant connections:
+- get_qdrant_client(): synchronous client for workers and scripts
+- get_async_qdrant_client(): AsyncQdrantClient for request handlers, so searches
+  don't block the event loop and many can be in flight at once
 """
 import os
 import logging
 from typing import Optional
-from qdrant_client import QdrantClient
+import httpx
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
@@ -17,12 +21,21 @@ load_dotenv()
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 
+# Async client tuning
+QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "10"))
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+# HTTP connection pool: max concurrent connections / idle connections kept alive
+QDRANT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", "100"))
+QDRANT_POOL_KEEPALIVE = int(os.getenv("QDRANT_POOL_KEEPALIVE", "20"))
+
 # Collection names
 PAPERS_COLLECTION = os.getenv("PAPERS_COLLECTION", "papers_semantic_v1")
 PDF_VECTORS_COLLECTION = os.getenv("PDF_VECTORS_COLLECTION", "pdf_vectors_v2")
 
-# Singleton client instance
+# Singleton client instances
 _qdrant_client: Optional[QdrantClient] = None
+_async_qdrant_client: Optional[AsyncQdrantClient] = None
 
 
 def get_qdrant_client(
@@ -79,6 +92,71 @@ def get_qdrant_client(
     return _qdrant_client
 
 
+def get_async_qdrant_client(
+    url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    timeout: int = QDRANT_TIMEOUT,
+    prefer_grpc: bool = QDRANT_PREFER_GRPC,
+) -> AsyncQdrantClient:
+    """
+    Get or create the async Qdrant client instance (singleton pattern).
+    
+    Args:
+        url: Qdrant server URL (defaults to env var QDRANT_URL)
+        api_key: Qdrant API key (defaults to env var QDRANT_API_KEY)
+        timeout: Request timeout in seconds
+        prefer_grpc: Use gRPC (port QDRANT_GRPC_PORT) instead of HTTP
+        
+    Returns:
+        AsyncQdrantClient instance, with an HTTP pool of QDRANT_POOL_SIZE connections
+        
+    Raises:
+        ValueError: If URL or API key are not provided and not in environment
+    """
+    global _async_qdrant_client
+    
+    qdrant_url = url or QDRANT_URL
+    qdrant_api_key = api_key or QDRANT_API_KEY
+    
+    if not qdrant_url:
+        raise ValueError(
+            "QDRANT_URL not found. Please set it in .env file or pass as argument."
+        )
+    if not qdrant_api_key:
+        raise ValueError(
+            "QDRANT_API_KEY not found. Please set it in .env file or pass as argument."
+        )
+    
+    if _async_qdrant_client is None:
+        try:
+            _async_qdrant_client = AsyncQdrantClient(
+                url=qdrant_url,
+                api_key=qdrant_api_key,
+                timeout=timeout,
+                prefer_grpc=prefer_grpc,
+                grpc_port=QDRANT_GRPC_PORT,
+                # passed through to the underlying httpx.AsyncClient (REST transport)
+                limits=httpx.Limits(
+                    max_connections=QDRANT_POOL_SIZE,
+                    max_keepalive_connections=QDRANT_POOL_KEEPALIVE,
+                ),
+            )
+            logger.info(f"✅ Async Qdrant client for {qdrant_url} (grpc={prefer_grpc}, pool={QDRANT_POOL_SIZE})")
+        except Exception as e:
+            logger.error(f"❌ Failed to create async Qdrant client: {e}")
+            raise
+    
+    return _async_qdrant_client
+
+
+async def close_async_qdrant_client():
+    """Close the async client's connection pool (call on application shutdown)."""
+    global _async_qdrant_client
+    if _async_qdrant_client is not None:
+        await _async_qdrant_client.close()
+        _async_qdrant_client = None
+
+
 def reset_qdrant_client():
     """
     Reset the singleton client instance.
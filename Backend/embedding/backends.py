@@ -0,0 +1,69 @@
+"""
+Inference backends for the 768-d paper search encoder (all-mpnet-base-v2).
+
+- torch:     PyTorch, what papers_semantic_v1 was indexed with
+- onnx:      the same weights exported to ONNX and run by ONNX Runtime
+- onnx-int8: ONNX Runtime with int8 dynamically quantized weights
+
+Every backend runs the same model, so query vectors stay in the indexed
+vector space and switching needs no re-indexing. Check agreement with the
+stored vectors before switching:
+
+    python -m Backend.embedding.parity --backend onnx-int8
+    python -m Backend.embedding.benchmark
+
+The ONNX backends need sentence-transformers >= 3.2 with its onnx extra
+(pip install "sentence-transformers[onnx]").
+"""
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SEARCH_DENSE_BACKENDS = ("torch", "onnx", "onnx-int8")
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch").strip().lower()
+# Quantized exports are written once and reused across restarts
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(BASE_DIR, "onnx_models"))
+# Target instruction set of the int8 kernels: arm64, avx2, avx512 or avx512_vnni
+ONNX_QUANTIZATION_CONFIG = os.getenv("ONNX_QUANTIZATION_CONFIG", "avx2")
+
+
+def _onnx_sentence_transformer(model_name_or_path: str, **kwargs):
+    from sentence_transformers import SentenceTransformer
+    try:
+        return SentenceTransformer(model_name_or_path, backend="onnx", **kwargs)
+    except TypeError as e:  # older sentence-transformers has no backend argument
+        raise RuntimeError(
+            "The ONNX embedding backends need sentence-transformers>=3.2 "
+            "(pip install \"sentence-transformers[onnx]\")"
+        ) from e
+
+
+def _quantized_model_dir(model_name: str) -> str:
+    return os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "__"))
+
+
+def load_sentence_transformer(model_name: str, backend: str = EMBED_BACKEND):
+    """SentenceTransformer for model_name running on the given backend."""
+    if backend not in SEARCH_DENSE_BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {SEARCH_DENSE_BACKENDS}")
+
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    if backend == "onnx":
+        return _onnx_sentence_transformer(model_name)
+
+    # onnx-int8: quantize the ONNX export once, then load the quantized file
+    model_dir = _quantized_model_dir(model_name)
+    file_name = f"onnx/model_qint8_{ONNX_QUANTIZATION_CONFIG}.onnx"
+    if not os.path.exists(os.path.join(model_dir, file_name)):
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        logger.info(f"⚙️ Quantizing {model_name} to int8 ({ONNX_QUANTIZATION_CONFIG}) in {model_dir}")
+        model = _onnx_sentence_transformer(model_name)
+        model.save_pretrained(model_dir)
+        export_dynamic_quantized_onnx_model(model, ONNX_QUANTIZATION_CONFIG, model_dir)
+    return _onnx_sentence_transformer(model_dir, model_kwargs={"file_name": file_name})
@@ -0,0 +1,115 @@
+"""
+Latency / throughput benchmark of the search encoder backends.
+
+Query texts are paper titles from data/metadata (short, like user queries);
+batch throughput uses the indexed "title. abstract. authors" texts. Per backend:
+load time, RSS growth, single-query latency and CPU time, and batched texts/s.
+
+    python -m Backend.embedding.benchmark --backends torch onnx onnx-int8
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from typing import Dict, List, Tuple
+
+from Backend.embedding.backends import SEARCH_DENSE_BACKENDS, load_sentence_transformer
+from Backend.models.registry import SEARCH_DENSE_MODEL, current_rss_bytes
+from Backend.utils.metrics import describe
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+METADATA_DIR = os.path.join(BASE_DIR, "..", "..", "data", "metadata")
+
+
+def load_texts(limit: int) -> Tuple[List[str], List[str]]:
+    """(titles, document texts) from the metadata batches, up to limit each."""
+    titles, docs = [], []
+    for path in sorted(glob.glob(os.path.join(METADATA_DIR, "*", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            for record in json.load(f):
+                title = " ".join((record.get("title") or "").split())
+                if not title:
+                    continue
+                abstract = (record.get("abstract") or "").strip()
+                authors = ", ".join(record.get("authors") or [])
+                titles.append(title)
+                docs.append(f"{title}. {abstract}. {authors}".strip())
+                if len(titles) >= limit:
+                    return titles, docs
+    return titles, docs
+
+
+def bench_backend(backend: str, queries: List[str], docs: List[str], batch_size: int) -> Dict:
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    model = load_sentence_transformer(SEARCH_DENSE_MODEL, backend)
+    load_seconds = time.perf_counter() - start
+    rss_after = current_rss_bytes()
+
+    model.encode(queries[:8])  # warm-up: first calls allocate / compile
+
+    latencies_ms = []
+    cpu_start = time.process_time()
+    for query in queries:
+        t0 = time.perf_counter()
+        model.encode([query])
+        latencies_ms.append((time.perf_counter() - t0) * 1000)
+    cpu_ms_per_query = (time.process_time() - cpu_start) * 1000 / len(queries)
+
+    t0 = time.perf_counter()
+    model.encode(docs, batch_size=batch_size)
+    batch_seconds = time.perf_counter() - t0
+
+    return {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 2),
+        "memory_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+        "query_latency_ms": describe(latencies_ms),
+        "query_cpu_ms": round(cpu_ms_per_query, 2),
+        "batch_texts_per_s": round(len(docs) / batch_seconds, 1) if batch_seconds > 0 else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=SEARCH_DENSE_BACKENDS, default=list(SEARCH_DENSE_BACKENDS))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args(argv)
+
+    queries, docs = load_texts(args.queries)
+    if not queries:
+        print(f"❌ No metadata found under {METADATA_DIR}")
+        return 1
+
+    results = []
+    for backend in args.backends:
+        try:
+            results.append(bench_backend(backend, queries, docs, args.batch_size))
+        except Exception as e:
+            results.append({"backend": backend, "error": str(e)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{len(queries)} single queries, {len(docs)} texts batched by {args.batch_size}")
+    print(f"{'backend':<10} {'load s':>7} {'MiB':>6} {'p50 ms':>7} {'p95 ms':>7} {'cpu ms':>7} {'texts/s':>8}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['backend']:<10} ❌ {r['error']}")
+            continue
+        mib = f"{r['memory_bytes'] / 2**20:.0f}" if r["memory_bytes"] is not None else "-"
+        q = r["query_latency_ms"]
+        print(
+            f"{r['backend']:<10} {r['load_seconds']:>7} {mib:>6} {q['p50']:>7.1f} {q['p95']:>7.1f} "
+            f"{r['query_cpu_ms']:>7} {r['batch_texts_per_s']:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
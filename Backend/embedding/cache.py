@@ -0,0 +1,168 @@
+"""
+Content-addressed embedding cache.
+
+Two tiers, keyed by (model name, SHA-256 of the normalized text):
+1. In-process LRU bounded by a byte budget
+2. SQLite file on disk, shared by every worker process and kept across restarts
+"""
+import os
+import re
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from Backend.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(BASE_DIR, "..", "database", "embedding_cache.db"),
+)
+EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "64"))
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-only normalization (case is kept: it can change embeddings)."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _entry_bytes(entry: Dict[str, np.ndarray]) -> int:
+    return sum(arr.nbytes for arr in entry.values()) + 64
+
+
+class EmbeddingCache:
+    """
+    Cache of {"dense", "indices", "values"} arrays per text.
+
+    Args:
+        path: SQLite file for the disk tier ("" disables it)
+        max_bytes: Byte budget for the in-process tier
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_bytes: int = EMBEDDING_CACHE_MAX_MB * 1024 * 1024):
+        self.memory = LRUCache(max_bytes=max_bytes, sizeof=_entry_bytes)
+        self.disk_hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    """CREATE TABLE IF NOT EXISTS embeddings (
+                        model TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        dense BLOB NOT NULL,
+                        indices BLOB NOT NULL,
+                        vals BLOB NOT NULL,
+                        PRIMARY KEY (model, key)
+                    )"""
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Embedding disk cache disabled ({path}): {e}")
+                self._conn = None
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[Dict[str, np.ndarray]]]:
+        """Look up every text; returns None for misses."""
+        keys = [text_key(t) for t in texts]
+        found = [self.memory.get((model, k)) for k in keys]
+
+        missing = [k for k, entry in zip(keys, found) if entry is None]
+        disk_hits = 0
+        if missing and self._conn is not None:
+            from_disk = self._read_disk(model, missing)
+            for i, k in enumerate(keys):
+                if found[i] is None and k in from_disk:
+                    found[i] = from_disk[k]
+                    self.memory.put((model, k), from_disk[k])
+                    disk_hits += 1
+
+        # lookups come from threadpool threads: count under the lock
+        with self._lock:
+            self.disk_hits += disk_hits
+            self.misses += sum(1 for entry in found if entry is None)
+        return found
+
+    def put_many(self, model: str, texts: List[str], entries: List[Dict[str, np.ndarray]]) -> None:
+        rows = []
+        for text, entry in zip(texts, entries):
+            k = text_key(text)
+            entry = {
+                "dense": np.ascontiguousarray(entry["dense"], dtype=np.float32),
+                "indices": np.ascontiguousarray(entry["indices"], dtype=np.int64),
+                "values": np.ascontiguousarray(entry["values"], dtype=np.float32),
+            }
+            self.memory.put((model, k), entry)
+            rows.append((model, k, entry["dense"].tobytes(), entry["indices"].tobytes(), entry["values"].tobytes()))
+
+        if rows and self._conn is not None:
+            try:
+                with self._lock:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (model, key, dense, indices, vals) VALUES (?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Failed to write embedding cache: {e}")
+
+    def _read_disk(self, model: str, keys: List[str]) -> Dict[str, Dict[str, np.ndarray]]:
+        result = {}
+        try:
+            with self._lock:
+                for i in range(0, len(keys), 500):  # stay under SQLite's variable limit
+                    part = keys[i:i + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, dense, indices, vals FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(part))})",
+                        [model, *part],
+                    ).fetchall()
+                    for k, dense, indices, vals in rows:
+                        result[k] = {
+                            "dense": np.frombuffer(dense, dtype=np.float32),
+                            "indices": np.frombuffer(indices, dtype=np.int64),
+                            "values": np.frombuffer(vals, dtype=np.float32),
+                        }
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Failed to read embedding cache: {e}")
+        return result
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        with self._lock:
+            disk_hits, misses = self.disk_hits, self.misses
+        lookups = memory["hits"] + disk_hits + misses
+        return {
+            "memory_entries": memory["entries"],
+            "memory_bytes": memory["bytes"],
+            "memory_hits": memory["hits"],
+            "disk_hits": disk_hits,
+            "misses": misses,
+            "hit_rate": round((memory["hits"] + disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the process-wide embedding cache (singleton pattern)."""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache()
+        return _embedding_cache
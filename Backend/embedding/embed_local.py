@@ -1,29 +1,96 @@
-from fastembed import SparseTextEmbedding, TextEmbedding
+import os
+import numpy as np
+from Backend.embedding.cache import get_embedding_cache
+from Backend.models.registry import get_model, BM25_MODEL, NOTES_DENSE_MODEL
 
-# Initialize local SMALL embedding models ONCE globally for Notes/Chat pipeline
+# Local SMALL embedding models for the Notes/Chat pipeline, loaded lazily by the model registry
 # This is separate from the main global paper search models
-BM25_MODEL_NAME = "Qdrant/bm25"
-DENSE_MODEL_NAME = "BAAI/bge-small-en-v1.5" # 384 dimensions, very fast
+BM25_MODEL_NAME = BM25_MODEL
+DENSE_MODEL_NAME = NOTES_DENSE_MODEL # 384 dimensions, very fast
+DENSE_DIM = 384 # output size of DENSE_MODEL_NAME, used when creating collections
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+
+
+# Cache namespace: one entry holds both the dense and the BM25 vector
+CACHE_MODEL_KEY = f"{DENSE_MODEL_NAME}+{BM25_MODEL_NAME}"
+
+
+def _embed_uncached(texts: list, batch_size: int) -> list:
+    """Run both models over texts; returns one {"dense", "indices", "values"} entry per text."""
+    dense = np.asarray(list(get_model("notes_dense").embed(texts, batch_size=batch_size)), dtype=np.float32)
+    # query_embed keeps the same BM25 weighting the stored vectors were built with
+    sparse = list(get_model("notes_bm25").query_embed(texts))
+    return [
+        {"dense": d, "indices": s.indices, "values": s.values}
+        for d, s in zip(dense, sparse)
+    ]
+
+
+def embed_batch_small(texts: list, batch_size: int = EMBED_BATCH_SIZE, use_cache: bool = True) -> dict:
+    """
+    Embed many strings in one pass using fastembed's native batching.
+    Texts already in the embedding cache never reach the models.
+
+    Returns contiguous NumPy arrays:
+        dense:          float32 (n, DENSE_DIM)
+        sparse_indptr:  int64 (n + 1,) row offsets into the two arrays below (CSR layout)
+        sparse_indices: int64 BM25 token ids, all rows concatenated
+        sparse_values:  float32 BM25 weights, all rows concatenated
+    """
+    texts = list(texts)
+    if not texts:
+        return {
+            "dense": np.empty((0, DENSE_DIM), dtype=np.float32),
+            "sparse_indptr": np.zeros(1, dtype=np.int64),
+            "sparse_indices": np.empty(0, dtype=np.int64),
+            "sparse_values": np.empty(0, dtype=np.float32),
+        }
+
+    cache = get_embedding_cache() if use_cache else None
+    entries = cache.get_many(CACHE_MODEL_KEY, texts) if cache else [None] * len(texts)
+
+    missing = [i for i, entry in enumerate(entries) if entry is None]
+    if missing:
+        computed = _embed_uncached([texts[i] for i in missing], batch_size)
+        for i, entry in zip(missing, computed):
+            entries[i] = entry
+        if cache:
+            cache.put_many(CACHE_MODEL_KEY, [texts[i] for i in missing], computed)
+
+    indptr = np.zeros(len(entries) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(e["indices"]) for e in entries])
+    return {
+        "dense": np.ascontiguousarray(np.stack([e["dense"] for e in entries]), dtype=np.float32),
+        "sparse_indptr": indptr,
+        "sparse_indices": np.concatenate([e["indices"] for e in entries]).astype(np.int64, copy=False),
+        "sparse_values": np.concatenate([e["values"] for e in entries]).astype(np.float32, copy=False),
+    }
+
+
+def sparse_row(batch: dict, i: int) -> dict:
+    """Sparse vector of row i of an embed_batch_small result, as Qdrant-ready lists."""
+    start, end = batch["sparse_indptr"][i], batch["sparse_indptr"][i + 1]
+    return {
+        "indices": batch["sparse_indices"][start:end].tolist(),
+        "values": batch["sparse_values"][start:end].tolist(),
+    }
+
+
+def embed_strings_small(texts: list) -> list:
+    """embed_string_small for many strings: one batched pass, one dict per text."""
+    batch = embed_batch_small(texts)
+    return [
+        {
+            "dense_embedding": batch["dense"][i].tolist(),
+            "sparse_embedding": sparse_row(batch, i),
+        }
+        for i in range(len(batch["dense"]))
+    ]
 
-print("🔌 Loading Fast Local Embedding Models for Notes/Chat...")
-bm25_embedding_model = SparseTextEmbedding(BM25_MODEL_NAME)
-dense_embedding_model = TextEmbedding(DENSE_MODEL_NAME)
-print("✅ Local Small Embedding Models Loaded")
 
 def embed_string_small(text: str):
     """
     Takes a string input and returns its embedding using Bge-small (384 dims).
     Used for local PDF notes and chat to ensure speed and consistency.
     """
-    # FastEmbed returns a generator, so we take the first item
-    dense_embedding = list(dense_embedding_model.embed([text]))[0]
-    bm25_embeddings = next(iter(bm25_embedding_model.query_embed(text)))
-    
-    enhanced = {
-        "dense_embedding": dense_embedding.tolist(),
-        "sparse_embedding": {
-            "indices": bm25_embeddings.indices.tolist(),
-            "values": bm25_embeddings.values.tolist(),
-        },
-    }
-    return enhanced
+    return embed_strings_small([text])[0]
@@ -1,31 +1,61 @@
-from fastembed import SparseTextEmbedding
-from sentence_transformers import SentenceTransformer
+from Backend.embedding.cache import get_embedding_cache
+from Backend.embedding.backends import EMBED_BACKEND, ONNX_QUANTIZATION_CONFIG
+from Backend.models.registry import get_model, BM25_MODEL, SEARCH_DENSE_MODEL
 
-# Initialize local embedding models ONCE globally
-BM25_MODEL_NAME = "Qdrant/bm25"
-DENSE_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+# Models are loaded once, lazily, by the model registry
+# The dense model runs on EMBED_BACKEND (torch / onnx / onnx-int8, see Backend.embedding.backends)
+BM25_MODEL_NAME = BM25_MODEL
+DENSE_MODEL_NAME = SEARCH_DENSE_MODEL
+# Cache namespace: one entry holds both the dense and the BM25 vector.
+# Other backends get their own namespace so their vectors never mix with torch ones,
+# and each int8 quantization config gets its own too.
+_BACKEND_TAG = f"{EMBED_BACKEND}-{ONNX_QUANTIZATION_CONFIG}" if EMBED_BACKEND == "onnx-int8" else EMBED_BACKEND
+CACHE_MODEL_KEY = f"{DENSE_MODEL_NAME}+{BM25_MODEL_NAME}" + ("" if EMBED_BACKEND == "torch" else f"@{_BACKEND_TAG}")
+
+def _to_response(entry: dict) -> dict:
+    return {
+        "dense_embedding": entry["dense"].tolist(),
+         "sparse_embedding": {
+                    "indices": entry["indices"].tolist(),
+                    "values": entry["values"].tolist(),
+           },
+    }
+
+
+def embed_strings(texts: list, batch_size: int = 32) -> list:
+    """
+    Embed many strings with one forward pass per model.
+    Returns one embed_string()-style dict per text, in input order.
+    Hot strings are served from the embedding cache without touching the models.
+    """
+    texts = list(texts)
+    cache = get_embedding_cache()
+    entries = cache.get_many(CACHE_MODEL_KEY, texts)
+
+    missing = [i for i, entry in enumerate(entries) if entry is None]
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        # Use sentence-transformers for dense embedding
+        dense_embeddings = get_model("search_dense").encode(missing_texts, batch_size=batch_size)
+        
+        # FastEmbed returns a generator for sparse embeddings
+        bm25_embeddings = list(get_model("search_bm25").query_embed(missing_texts))
+
+        computed = [
+            {"dense": dense, "indices": sparse.indices, "values": sparse.values}
+            for dense, sparse in zip(dense_embeddings, bm25_embeddings)
+        ]
+        for i, entry in zip(missing, computed):
+            entries[i] = entry
+        cache.put_many(CACHE_MODEL_KEY, missing_texts, computed)
+
+    return [_to_response(entry) for entry in entries]
 
-print("🔌 Loading Local Embedding Models...")
-bm25_embedding_model = SparseTextEmbedding(BM25_MODEL_NAME)
-dense_embedding_model = SentenceTransformer(DENSE_MODEL_NAME)
-print("✅ Local Embedding Models Loaded")
 
 def embed_string(text:str):
     """
     Takes a string input and returns its embedding.
-    Using sentence-transformers for dense (768) and fastembed for sparse.
+    Using sentence-transformers for dense (768, on EMBED_BACKEND) and fastembed for sparse.
+    Blocking; async request handlers should use Backend.embedding.inference.aembed_string.
     """
-    # Use sentence-transformers for dense embedding
-    dense_embedding = dense_embedding_model.encode(text)
-    
-    # FastEmbed returns a generator for sparse embeddings
-    bm25_embeddings = next(iter(bm25_embedding_model.query_embed(text)))
-    
-    enhanced={
-        "dense_embedding": dense_embedding.tolist(),
-         "sparse_embedding": {
-                    "indices": bm25_embeddings.indices.tolist(),
-                    "values": bm25_embeddings.values.tolist(),
-           },
-    }
-    return enhanced
+    return embed_strings([text])[0]
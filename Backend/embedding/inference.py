@@ -0,0 +1,155 @@
+"""
+Inference layer for request handlers.
+
+Model forward passes are CPU-bound and must not run on the event loop.
+Requests are queued in a MicroBatcher: strings that arrive while a batch is
+being collected (or while the previous batch is still running) are embedded
+together in one model call on a bounded executor, and each caller awaits
+only its own result.
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from Backend.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Threads running model calls; torch / onnxruntime already use every core per call
+INFERENCE_MAX_WORKERS = int(os.getenv("INFERENCE_MAX_WORKERS", "1"))
+# Collection window for a batch, and its size cap
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "5"))
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "32"))
+
+# Histogram bounds exported to /metrics
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUEUE_DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into batched calls of fn.
+
+    Args:
+        name: Metrics prefix (inference.<name>.*)
+        fn: Blocking function mapping a list of items to a list of results (same order)
+        executor: Where fn runs
+        max_batch: Flush as soon as this many items are waiting
+        max_wait_ms: Flush at most this long after the first item of a batch arrives
+        max_inflight: Batches allowed to run at once; while all slots are busy new
+            items keep accumulating and go out together when a slot frees up
+
+    Only used from one event loop; no locking needed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[List[Any]], List[Any]],
+        executor: ThreadPoolExecutor,
+        max_batch: int = MICRO_BATCH_MAX_SIZE,
+        max_wait_ms: float = MICRO_BATCH_MAX_WAIT_MS,
+        max_inflight: int = INFERENCE_MAX_WORKERS,
+    ):
+        self.name = name
+        self.fn = fn
+        self.executor = executor
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_inflight = max(1, max_inflight)
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # queue depth seen by this request: how much work is ahead of it
+        get_metrics().observe(f"inference.{self.name}.queue_depth", len(self._pending), buckets=QUEUE_DEPTH_BUCKETS)
+        self._pending.append((item, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        metrics = get_metrics()
+        while self._pending and self._inflight < self.max_inflight:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            now = time.perf_counter()
+            metrics.observe(f"inference.{self.name}.batch_size", len(batch), buckets=BATCH_SIZE_BUCKETS)
+            metrics.observe(f"inference.{self.name}.wait_ms", (now - batch[0][2]) * 1000)
+            self._inflight += 1
+            asyncio.get_running_loop().create_task(self._run(batch))
+        # anything left is flushed when a running batch completes
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        loop = asyncio.get_running_loop()
+        try:
+            start = time.perf_counter()
+            results = await loop.run_in_executor(self.executor, self.fn, [item for item, _, _ in batch])
+            get_metrics().observe(f"inference.{self.name}.run_ms", (time.perf_counter() - start) * 1000)
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._inflight -= 1
+            if self._pending:
+                self._flush()
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_query_batcher: Optional[MicroBatcher] = None
+_small_batcher: Optional[MicroBatcher] = None
+_lock = threading.Lock()
+
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """Get or create the bounded inference executor (singleton pattern)."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=INFERENCE_MAX_WORKERS, thread_name_prefix="inference")
+        return _executor
+
+
+def get_query_batcher() -> MicroBatcher:
+    """Micro-batcher around embed_strings (all-mpnet-base-v2 + BM25), the paper search encoder."""
+    global _query_batcher
+    if _query_batcher is None:
+        from Backend.embedding.embedd import embed_strings
+        _query_batcher = MicroBatcher("query", embed_strings, get_inference_executor())
+    return _query_batcher
+
+
+def get_small_batcher() -> MicroBatcher:
+    """Micro-batcher around bge-small + BM25, the notes / chat encoder."""
+    global _small_batcher
+    if _small_batcher is None:
+        from Backend.embedding.embed_local import embed_strings_small
+        _small_batcher = MicroBatcher("small", embed_strings_small, get_inference_executor())
+    return _small_batcher
+
+
+async def aembed_string(text: str) -> dict:
+    """Async embed_string: same result, computed off the event loop and batched with concurrent callers."""
+    return await get_query_batcher().submit(text)
+
+
+async def aembed_string_small(text: str) -> dict:
+    """Async embed_string_small, batched like aembed_string."""
+    return await get_small_batcher().submit(text)
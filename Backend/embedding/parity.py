@@ -0,0 +1,99 @@
+"""
+Parity check of a search encoder backend against the stored paper vectors.
+
+Re-encodes the indexed text of a sample of papers_semantic_v1 points on the
+chosen backend and compares each result with the stored dense vector (built
+with the torch backend). The check passes when the 5th-percentile cosine
+similarity is at least the threshold, i.e. queries encoded on this backend
+land where the index expects them.
+
+    python -m Backend.embedding.parity --backend onnx-int8 --sample 500
+"""
+import sys
+import argparse
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from Backend.database.qdrant_client import get_qdrant_client, get_collection_name
+from Backend.embedding.backends import SEARCH_DENSE_BACKENDS, load_sentence_transformer
+from Backend.models.registry import SEARCH_DENSE_MODEL
+from Backend.utils.metrics import describe, percentile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE = 500
+DEFAULT_THRESHOLD = 0.98  # min p5 cosine to the stored vectors
+
+
+def sample_stored_vectors(limit: int) -> Tuple[List[str], np.ndarray]:
+    """(indexed text, stored dense vector) for up to limit points of the papers collection."""
+    client = get_qdrant_client()
+    texts, vectors = [], []
+    offset = None
+    while len(texts) < limit:
+        points, offset = client.scroll(
+            collection_name=get_collection_name("papers_semantic_v1"),
+            limit=min(256, limit - len(texts)),
+            offset=offset,
+            with_payload=["text"],
+            with_vectors=["dense"],
+        )
+        for point in points:
+            text = (point.payload or {}).get("text")
+            vector = point.vector.get("dense") if isinstance(point.vector, dict) else point.vector
+            if text and vector:
+                texts.append(text)
+                vectors.append(vector)
+        if offset is None:
+            break
+    return texts, np.asarray(vectors, dtype=np.float32)
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def check_parity(backend: str, sample: int = DEFAULT_SAMPLE, threshold: float = DEFAULT_THRESHOLD) -> Dict:
+    texts, stored = sample_stored_vectors(sample)
+    if not texts:
+        raise RuntimeError("No points with stored text and dense vectors to compare against")
+
+    model = load_sentence_transformer(SEARCH_DENSE_MODEL, backend)
+    encoded = np.asarray(model.encode(texts, batch_size=32), dtype=np.float32)
+    cosines = cosine_rows(encoded, stored)
+
+    values = sorted(cosines.tolist())
+    p5 = percentile(values, 5)
+    return {
+        "backend": backend,
+        "cosine": {**describe(values), "p5": round(p5, 4), "min": round(values[0], 4)},
+        "below_threshold": int(np.sum(cosines < threshold)),
+        "threshold": threshold,
+        "passed": p5 >= threshold,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=SEARCH_DENSE_BACKENDS, default="onnx-int8")
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    result = check_parity(args.backend, args.sample, args.threshold)
+    c = result["cosine"]
+    print(
+        f"{'✅' if result['passed'] else '❌'} {result['backend']}: cosine to stored vectors over {c['count']} points "
+        f"mean={c['mean']} p50={c['p50']} p5={c['p5']} min={c['min']} "
+        f"({result['below_threshold']} below {result['threshold']})"
+    )
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import os
 import time
 import gc
+import asyncio
 from typing import Literal
 from unstructured.partition.pdf import partition_pdf
 from unstructured.partition.image import partition_image
@@ -11,8 +12,12 @@ from unstructured.documents.elements import (
 )
 from langchain_core.prompts import PromptTemplate
 from Backend.models.hugging_face import hugging_face_query_expand
+from Backend.search.lexical_expansion import lexical_query_expand
 import re
 
+# "llm" (default), "lexical" or "none"; see expand_query
+QUERY_EXPANSION_MODE = os.getenv("QUERY_EXPANSION_MODE", "llm")
+
 # --------------------------------------------------
 # SAFE FILE DELETE (WINDOWS FRIENDLY)
 # --------------------------------------------------
@@ -149,26 +154,52 @@ def extract_text_for_search(
 # --------------------------------------------------
 # TEXT QUERY ENHANCEMENT
 # --------------------------------------------------
+def expand_query(text: str, mode: str = None) -> str:
+    """
+    Expand a query with the given (default: QUERY_EXPANSION_MODE) engine:
+    - "llm": remote LLM rewrite into an academic-style paragraph (hugging_face_query_expand)
+    - "lexical": related terms and acronyms from the local corpus thesaurus, no network
+    - "none": the query as is
+    """
+    mode = (mode or QUERY_EXPANSION_MODE).lower()
+    if mode == "llm":
+        return hugging_face_query_expand(text=text)
+    if mode == "lexical":
+        return lexical_query_expand(text)
+    if mode == "none":
+        return text.strip()
+    raise ValueError(f"Unknown query expansion mode: {mode!r}")
+
+
 def enhance_text_query(user_input: str) -> dict:
     """
     Enhance a user query for embedding-based semantic search.
-    Preserves author detection and expands query with technical keywords.
+    Preserves author detection and expands query with technical keywords
+    (engine selected by QUERY_EXPANSION_MODE).
     """
     if not user_input or not user_input.strip():
         raise ValueError("User input is empty")
 
-    # Expand query using hugging_face_query_expand
-    enhanced_text = hugging_face_query_expand(
-        text=user_input
-    )
+    enhanced_text = expand_query(user_input)
 
-    # Detect author if mentioned in query
+    return {
+        "enhanced_text": enhanced_text,
+        "author": detect_author(user_input)
+    }
+
+
+def detect_author(user_input: str):
+    """Author name if the query mentions one ("by Hinton", "author Yann LeCun"), else None."""
     author_match = re.search(
         r'(?:author|by)\s+([A-Z][a-zA-Z]*(?:\s+[A-Z][a-zA-Z\.]*)*)',
         user_input
     )
+    return author_match.group(1) if author_match else None
 
-    return {
-        "enhanced_text": enhanced_text,
-        "author": author_match.group(1) if author_match else None
-    }
+
+async def aenhance_text_query(user_input: str) -> dict:
+    """
+    enhance_text_query for request handlers: the remote call runs on a thread,
+    so the event loop keeps serving and concurrent identical queries can share it.
+    """
+    return await asyncio.to_thread(enhance_text_query, user_input)
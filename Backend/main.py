@@ -1,13 +1,52 @@
 from fastapi import FastAPI
 from Backend.routes.search import router as search_router
 from Backend.routes.auth import router as auth_router
+from Backend.routes.metrics import router as metrics_router
+from Backend.workers.runner import start_embedded_worker, stop_embedded_worker
+from Backend.database.job_events import get_job_event_hub
+from Backend.database.qdrant_client import close_async_qdrant_client
+from Backend.models.registry import get_registry, API_MODELS
 import uvicorn
 
 app = FastAPI()
 
+
+@app.on_event("startup")
+def warm_up_models():
+    """Load models in the background; the server accepts traffic right away (see /ready)."""
+    get_registry().warm_up(API_MODELS)
+
+
+@app.on_event("startup")
+def start_job_worker():
+    """Notes / chat jobs run in a separate worker (see Backend/workers/runner.py)."""
+    app.state.job_worker = start_embedded_worker()
+
+
+@app.on_event("startup")
+async def start_job_events():
+    """Follow the job store's change feed so waiting requests are pushed updates."""
+    await get_job_event_hub().start()
+
+
+@app.on_event("shutdown")
+async def stop_job_events():
+    await get_job_event_hub().stop()
+
+
+@app.on_event("shutdown")
+async def close_qdrant():
+    await close_async_qdrant_client()
+
+
+@app.on_event("shutdown")
+def stop_job_worker():
+    stop_embedded_worker(getattr(app.state, "job_worker", None))
+
 # Register routes
 app.include_router(search_router)
 app.include_router(auth_router)
+app.include_router(metrics_router)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+"""
+Persistent cache of LLM query expansions.
+
+Keyed by (model, prompt version, SHA-256 of the normalized input), so a
+prompt or model change never serves old expansions. Two tiers, like the
+embedding cache:
+1. In-process LRU bounded by a byte budget
+2. SQLite file on disk, shared by every worker process and kept across restarts
+
+Concurrent misses for the same key are coalesced into one remote call.
+"""
+import os
+import re
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Callable, Optional
+
+from Backend.utils.cache import LRUCache, SingleFlight
+from Backend.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EXPANSION_CACHE_PATH = os.getenv(
+    "EXPANSION_CACHE_PATH",
+    os.path.join(BASE_DIR, "..", "database", "expansion_cache.db"),
+)
+EXPANSION_CACHE_MAX_MB = int(os.getenv("EXPANSION_CACHE_MAX_MB", "8"))
+
+
+def normalize_input(text: str) -> str:
+    """Case and whitespace don't change the expansion we want."""
+    return re.sub(r"\s+", " ", (text or "").lower()).strip()
+
+
+def input_key(text: str) -> str:
+    return hashlib.sha256(normalize_input(text).encode("utf-8")).hexdigest()
+
+
+class ExpansionCache:
+    """
+    Args:
+        path: SQLite file for the disk tier ("" disables it)
+        max_bytes: Byte budget for the in-process tier
+    """
+
+    def __init__(self, path: str = EXPANSION_CACHE_PATH, max_bytes: int = EXPANSION_CACHE_MAX_MB * 1024 * 1024):
+        self.memory = LRUCache(max_bytes=max_bytes, sizeof=lambda value: len(value.encode("utf-8")) + 64)
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._flights = SingleFlight()
+        self._conn = None
+        self._lock = threading.Lock()
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    """CREATE TABLE IF NOT EXISTS expansions (
+                        model TEXT NOT NULL,
+                        prompt_version TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        expansion TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        PRIMARY KEY (model, prompt_version, key)
+                    )"""
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Expansion disk cache disabled ({path}): {e}")
+                self._conn = None
+
+    def get_or_compute(self, model: str, prompt_version: str, text: str, compute: Callable[[], str]) -> str:
+        """Cached expansion of text, calling compute() (once per concurrent key) on a miss."""
+        key = (model, prompt_version, input_key(text))
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached
+
+        cached = self._read_disk(key)
+        if cached is not None:
+            self.memory.put(key, cached)
+            with self._lock:
+                self.disk_hits += 1
+            return cached
+
+        def call() -> str:
+            start = time.perf_counter()
+            expansion = compute()
+            get_metrics().observe("expansion.remote_ms", (time.perf_counter() - start) * 1000)
+            if expansion:  # never cache an empty expansion
+                self.memory.put(key, expansion)
+                self._write_disk(key, expansion)
+            return expansion
+
+        expansion, shared = self._flights.do(key, call)
+        with self._lock:
+            if shared:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+        return expansion
+
+    def _read_disk(self, key) -> Optional[str]:
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT expansion FROM expansions WHERE model = ? AND prompt_version = ? AND key = ?",
+                    key,
+                ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Failed to read expansion cache: {e}")
+            return None
+
+    def _write_disk(self, key, expansion: str) -> None:
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO expansions (model, prompt_version, key, expansion, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (*key, expansion, time.time()),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Failed to write expansion cache: {e}")
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        lookups = memory["hits"] + self.disk_hits + self.coalesced + self.misses
+        return {
+            "memory_entries": memory["entries"],
+            "memory_bytes": memory["bytes"],
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+        }
+
+
+_expansion_cache: Optional[ExpansionCache] = None
+_expansion_cache_lock = threading.Lock()
+
+
+def get_expansion_cache() -> ExpansionCache:
+    """Get or create the process-wide expansion cache (singleton pattern)."""
+    global _expansion_cache
+    with _expansion_cache_lock:
+        if _expansion_cache is None:
+            _expansion_cache = ExpansionCache()
+        return _expansion_cache
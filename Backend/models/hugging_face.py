@@ -1,25 +1,21 @@
-import os
 from huggingface_hub import InferenceClient
 from dotenv import load_dotenv
 import numpy as np
 
 load_dotenv(".env")
 
-_hf_client_cache = None
-
 import time
-def _get_hf_client():
-    global _hf_client_cache
+from Backend.models.registry import get_model
+from Backend.models.expansion_cache import get_expansion_cache
 
-    if _hf_client_cache is None:
-        hf_token = os.getenv("HF_TOKEN")
-        if not hf_token:
-            raise RuntimeError("HF_TOKEN not found in .env")
+# Bump whenever the query expansion prompt (or its generation settings) change:
+# it is part of the expansion cache key, so old expansions stop being served.
+QUERY_EXPAND_PROMPT_VERSION = "v1"
 
-        print("🔌 Loading Hugging Face Inference Client...")
-        _hf_client_cache = InferenceClient(api_key=hf_token)
 
-    return _hf_client_cache
+def _get_hf_client() -> InferenceClient:
+    # created once, on first use, by the model registry ("hf")
+    return get_model("hf")
 def hugging_face_query_expand(
     text: str,
     model_name: str = "Qwen/Qwen2.5-7B-Instruct",
@@ -29,10 +25,20 @@ def hugging_face_query_expand(
     Expand/rewrite text into a detailed academic-style query
     using DeepSeek-V3.2 via Hugging Face Inference API (chat completion).
     Returns a string suitable for embeddings.
+    Expansions are cached (memory + disk) and concurrent identical calls share one request.
     """
     if not text or not text.strip():
         return ""
 
+    return get_expansion_cache().get_or_compute(
+        f"{model_name}@{temperature}",
+        QUERY_EXPAND_PROMPT_VERSION,
+        text,
+        lambda: _query_expand_remote(text, model_name, temperature),
+    )
+
+
+def _query_expand_remote(text: str, model_name: str, temperature: float) -> str:
     client = _get_hf_client()  # Make sure your HF token is set
 
     prompt = f"""
@@ -25,6 +25,33 @@ Text:
 Extracted Information:""",
 input_variables=["element"]
 
+)
+# Packed variant of BATCH_PROMPT_1: several chunks per request, JSON keyed by chunk id
+PACKED_BATCH_PROMPT = PromptTemplate(
+    template="""
+You are an expert at extracting key information from research paper chunks.
+
+**Your task**: For EACH chunk below, extract and condense the most important information.
+Focus on facts, numbers, methodologies, results, and technical details.
+
+**Rules**:
+- Extract only factual information explicitly stated in that chunk
+- Preserve exact numbers, metrics, datasets, model names, and terminology
+- Do NOT mix information between chunks
+- Do NOT hallucinate or infer
+- Keep each extraction concise (1-2 sentences)
+
+**Output Format (STRICT JSON ONLY, one key per chunk id, no other text)**:
+{{
+  "c0": "extracted information for chunk c0",
+  "c1": "extracted information for chunk c1"
+}}
+
+Chunks:
+{chunks}
+
+JSON Output:""",
+    input_variables=["chunks"]
 )
 NOTES_PROMPT=PromptTemplate(
     template="""
@@ -0,0 +1,250 @@
+"""
+Lazy, thread-safe model registry.
+
+Embedding models, LLM / inference clients and the Qdrant client are created
+on first use (or by the background warm-up), never as an import side effect,
+so the API starts accepting traffic immediately and each process only loads
+what it actually uses.
+
+Instances are owned per (model name, backend). Call sites ask for a role
+("search_bm25", "notes_bm25", ...) and roles that resolve to the same
+(model, backend) share one instance, e.g. a single Qdrant/bm25 model serves
+both paper search and notes / chat.
+
+    from Backend.models.registry import get_model
+    model = get_model("search_dense")
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:  # optional: fall back to /proc or resource
+    psutil = None
+
+from Backend.embedding.backends import EMBED_BACKEND
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DENSE_MODEL = "sentence-transformers/all-mpnet-base-v2"
+NOTES_DENSE_MODEL = "BAAI/bge-small-en-v1.5"
+BM25_MODEL = "Qdrant/bm25"
+NOTES_LLM_MODEL = "llama-3.3-70b-versatile"
+
+ModelKey = Tuple[str, str]  # (model name, backend)
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process (None if it can't be measured)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # peak, not current; kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class ModelRegistry:
+    """
+    Loaders and instances keyed by (model name, backend), plus role aliases.
+
+    Each key has its own load lock, so loading one model never blocks users of
+    another. memory_bytes is the RSS growth measured around a load; when other
+    loads overlapped it, it includes their growth too and is flagged with
+    memory_approximate. Lookups of loaded models take no lock.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[ModelKey, Callable[[], Any]] = {}
+        self._roles: Dict[str, ModelKey] = {}
+        self._models: Dict[ModelKey, Any] = {}
+        self._status: Dict[ModelKey, Dict[str, Any]] = {}
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+        # key -> whether another load overlapped it (RSS growth not attributable)
+        self._in_flight: Dict[ModelKey, bool] = {}
+        self._lock = threading.Lock()  # guards the dicts above, never held during a load
+
+    def register(self, role: str, model_name: str, backend: str, loader: Callable[[], Any]) -> None:
+        """Map role to (model_name, backend); the first loader registered for a key wins."""
+        key = (model_name, backend)
+        with self._lock:
+            self._roles[role] = key
+            self._loaders.setdefault(key, loader)
+            self._status.setdefault(key, {"state": "cold"})
+            self._load_locks.setdefault(key, threading.Lock())
+
+    def key_for(self, role: str) -> ModelKey:
+        key = self._roles.get(role)
+        if key is None:
+            raise KeyError(f"Unknown model: {role}")
+        return key
+
+    def get(self, role: str) -> Any:
+        key = self.key_for(role)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._load_locks[key]:
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            with self._lock:
+                for other in self._in_flight:
+                    self._in_flight[other] = True
+                self._in_flight[key] = bool(self._in_flight)
+            self._status[key] = {"state": "loading"}
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            try:
+                model = self._loaders[key]()
+            except Exception as e:
+                self._status[key] = {"state": "error", "error": str(e)}
+                logger.error(f"❌ Failed to load model {key[0]} [{key[1]}]: {e}")
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                rss_after = current_rss_bytes()
+                with self._lock:
+                    overlapped = self._in_flight.pop(key)
+
+            self._models[key] = model
+            status = {"state": "ready", "load_seconds": round(elapsed, 2)}
+            if rss_before is not None and rss_after is not None:
+                status["memory_bytes"] = max(0, rss_after - rss_before)
+                if overlapped:
+                    status["memory_approximate"] = True
+            self._status[key] = status
+            logger.info(
+                f"✅ Model {key[0]} [{key[1]}] loaded in {elapsed:.1f}s"
+                + (f", +{status['memory_bytes'] / 2**20:.0f} MiB RSS" if "memory_bytes" in status else "")
+                + (" (approximate, other loads overlapped)" if status.get("memory_approximate") else "")
+            )
+            return model
+
+    def is_ready(self, roles: Optional[Iterable[str]] = None) -> bool:
+        keys = [self.key_for(r) for r in roles] if roles is not None else list(self._loaders)
+        return all(key in self._models for key in keys)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Per loaded-or-known instance: state, load time, RSS growth while loading,
+        and the roles sharing it; plus the current process RSS.
+        """
+        roles_by_key: Dict[ModelKey, List[str]] = {}
+        for role, key in self._roles.items():
+            roles_by_key.setdefault(key, []).append(role)
+
+        models = {}
+        for key in self._loaders:
+            entry = dict(self._status.get(key, {"state": "cold"}))
+            entry.update({"model": key[0], "backend": key[1], "roles": sorted(roles_by_key.get(key, []))})
+            models[f"{key[0]} [{key[1]}]"] = entry
+        return {
+            "models": models,
+            "loaded_memory_bytes": sum(m.get("memory_bytes", 0) for m in models.values()),
+            "process_rss_bytes": current_rss_bytes(),
+        }
+
+    def warm_up(self, roles: Optional[Iterable[str]] = None) -> threading.Thread:
+        """Load models one by one on a background thread; failures are recorded, not raised."""
+        roles = list(roles) if roles is not None else list(self._roles)
+
+        def run():
+            for role in roles:
+                try:
+                    self.get(role)
+                except Exception:
+                    pass  # already logged and visible in status()
+
+        thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+
+# ----------------------------
+# Loaders (imports stay inside so importing this module is cheap)
+# ----------------------------
+def _load_search_dense():
+    from Backend.embedding.backends import load_sentence_transformer
+    return load_sentence_transformer(SEARCH_DENSE_MODEL, EMBED_BACKEND)
+
+
+def _load_bm25():
+    from fastembed import SparseTextEmbedding
+    return SparseTextEmbedding(BM25_MODEL)
+
+
+def _load_notes_dense():
+    from fastembed import TextEmbedding
+    return TextEmbedding(NOTES_DENSE_MODEL)
+
+
+def _load_notes_llm():
+    from langchain_groq import ChatGroq
+    return ChatGroq(
+        temperature=0.1,  # Lower temperature for more focused output
+        model=NOTES_LLM_MODEL  # Best for structured academic notes
+    )
+
+
+def _load_groq():
+    from groq import Groq
+    return Groq(api_key=os.environ.get("GROQ_API_KEY"))
+
+
+def _load_hf():
+    from huggingface_hub import InferenceClient
+    hf_token = os.getenv("HF_TOKEN")
+    if not hf_token:
+        raise RuntimeError("HF_TOKEN not found in .env")
+    return InferenceClient(api_key=hf_token)
+
+
+def _load_qdrant():
+    from Backend.database.qdrant_client import get_qdrant_client
+    return get_qdrant_client()
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_init_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Get or create the model registry with the built-in loaders (singleton pattern)."""
+    global _registry
+    with _registry_init_lock:
+        if _registry is None:
+            registry = ModelRegistry()
+            registry.register("search_dense", SEARCH_DENSE_MODEL, EMBED_BACKEND, _load_search_dense)  # paper search, 768-d
+            registry.register("search_bm25", BM25_MODEL, "fastembed", _load_bm25)
+            registry.register("notes_dense", NOTES_DENSE_MODEL, "fastembed", _load_notes_dense)  # notes / chat, 384-d
+            registry.register("notes_bm25", BM25_MODEL, "fastembed", _load_bm25)  # same instance as search_bm25
+            registry.register("notes_llm", NOTES_LLM_MODEL, "groq-langchain", _load_notes_llm)
+            registry.register("groq", "groq", "client", _load_groq)  # vision captions
+            registry.register("hf", "huggingface-inference", "client", _load_hf)  # query expansion
+            registry.register("qdrant", "qdrant", "client", _load_qdrant)
+            _registry = registry
+        return _registry
+
+
+def get_model(name: str) -> Any:
+    return get_registry().get(name)
+
+
+# What each process needs before it is useful (warmed up at startup, checked by /ready)
+API_MODELS: List[str] = ["qdrant", "search_dense", "search_bm25", "notes_dense", "notes_bm25", "hf"]
+WORKER_MODELS: List[str] = ["qdrant", "notes_dense", "notes_bm25", "notes_llm", "groq"]
@@ -1,64 +1,105 @@
 import os
+import hashlib
 import logging
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 from dotenv import load_dotenv
+from Backend.utils.rate_limit import get_rate_limiter, retry_with_backoff
+from Backend.models.registry import get_model
 
 load_dotenv()
 
 # Setup Logger
 logger = logging.getLogger(__name__)
 
-# Initialize Groq Client
-try:
-    client = Groq(
-        api_key=os.environ.get("GROQ_API_KEY"),
+VISION_MODEL_NAME = "meta-llama/llama-4-maverick-17b-128e-instruct"
+DEFAULT_VISION_PROMPT = "Describe this detailed scientific figure/table concisely. Focus on the key trends, data points, and structural relationships shown."
+
+# Concurrency / rate limits for the vision stage
+VISION_MAX_WORKERS = int(os.getenv("VISION_MAX_WORKERS", "4"))
+VISION_RPM = int(os.getenv("GROQ_VISION_RPM", "30"))
+VISION_RETRIES = int(os.getenv("VISION_RETRIES", "3"))
+
+
+def _vision_limiter():
+    return get_rate_limiter("groq_vision", rpm=VISION_RPM)
+
+
+def _call_vision_model(base64_string: str, prompt: str) -> str:
+    """Single rate-limited Groq Vision call. Raises on failure."""
+    _vision_limiter().acquire()
+    completion = get_model("groq").chat.completions.create(
+        model=VISION_MODEL_NAME,
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text", 
+                        "text": prompt
+                    },
+                    {
+                        "type": "image_url", 
+                        "image_url": {
+                            "url": f"data:image/jpeg;base64,{base64_string}"
+                        }
+                    }
+                ]
+            }
+        ],
+        temperature=0.1,
+        max_tokens=300,
+        top_p=1,
+        stream=False,
+        stop=None,
     )
-    logger.info("✅ Groq Vision Client Initialized")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize Groq Client: {e}")
-    client = None
+    
+    description = completion.choices[0].message.content
+    return description.strip()
+
 
-def describe_image(base64_string: str, prompt: str = "Describe this detailed scientific figure/table concisely. Focus on the key trends, data points, and structural relationships shown.") -> str:
+def describe_image(base64_string: str, prompt: str = DEFAULT_VISION_PROMPT) -> str:
     """
     Generate a text description for a base64 encoded image using Groq Vision model.
     """
-    if not client:
-        logger.error("Groq client not initialized")
+    try:
+        get_model("groq")  # Groq client is created on first use
+    except Exception as e:
+        logger.error(f"Groq client not initialized: {e}")
         return "[Error: Vision Client Unavailable]"
 
     if not base64_string:
         return "[Error: Empty Image Data]"
 
     try:
-        completion = client.chat.completions.create(
-            model="meta-llama/llama-4-maverick-17b-128e-instruct",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text", 
-                            "text": prompt
-                        },
-                        {
-                            "type": "image_url", 
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_string}"
-                            }
-                        }
-                    ]
-                }
-            ],
-            temperature=0.1,
-            max_tokens=300,
-            top_p=1,
-            stream=False,
-            stop=None,
+        return retry_with_backoff(
+            lambda: _call_vision_model(base64_string, prompt),
+            retries=VISION_RETRIES,
+            limiter=_vision_limiter(),
         )
-        
-        description = completion.choices[0].message.content
-        return description.strip()
-
     except Exception as e:
         logger.error(f"❌ Vision API Call Failed: {e}")
         return f"[Error processing image: {str(e)}]"
+
+
+def describe_images(base64_strings: List[str], prompt: str = DEFAULT_VISION_PROMPT) -> Dict[str, str]:
+    """
+    Caption many images in parallel with bounded concurrency.
+    Identical payloads are captioned only once.
+
+    Returns:
+        Dict mapping the SHA-256 of each base64 payload to its description
+    """
+    unique = {}
+    for b64 in base64_strings:
+        if b64:
+            unique.setdefault(hashlib.sha256(b64.encode()).hexdigest(), b64)
+
+    if not unique:
+        return {}
+
+    logger.info(f"Captioning {len(unique)} unique visuals ({len(base64_strings)} total) with {VISION_MAX_WORKERS} workers")
+    with ThreadPoolExecutor(max_workers=VISION_MAX_WORKERS) as pool:
+        descriptions = list(pool.map(lambda b64: describe_image(b64, prompt), unique.values()))
+
+    return dict(zip(unique.keys(), descriptions))
@@ -1,4 +1,6 @@
 import hashlib
+import json
+import re
 import uuid
 import traceback
 import logging
@@ -6,16 +8,20 @@ from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.embeddings import Embeddings
 from Backend.notes.text.extractor import DocumentChunkExtractor
-from Backend.embedding.embed_local import embed_string_small
+from Backend.embedding.embed_local import embed_batch_small, embed_string_small, sparse_row, DENSE_DIM
 from langchain_qdrant import QdrantVectorStore
 from qdrant_client.models import Distance, VectorParams, SparseVectorParams, SparseIndexParams
 from Backend.models.groq import groq_llm
-from Backend.models.prompts import BATCH_PROMPT_1
+from Backend.models.prompts import BATCH_PROMPT_1, PACKED_BATCH_PROMPT
 from Backend.database.qdrant_client import get_qdrant_client, get_collection_name, get_collection_name
-from Backend.notes.text.model import summarize_chain
-from Backend.notes.Visual.vision_service import describe_image
+from Backend.database.blob_store import get_blob_store
+from Backend.notes.Visual.vision_service import describe_images
+from Backend.workers.stages import stage
+from Backend.workers.progress import report_progress, timed
+from Backend.utils.rate_limit import get_rate_limiter, retry_with_backoff
 from collections import defaultdict
-import time
+from concurrent.futures import ThreadPoolExecutor
+import os
 
 # ------------------- Logging Setup -------------------
 logging.basicConfig(
@@ -24,8 +30,17 @@ logging.basicConfig(
     datefmt="%H:%M:%S"
 )
 
-# ------------------- Qdrant Client - Centralized -------------------
-client = get_qdrant_client()
+# ------------------- Summarization Limits -------------------
+# Defaults match Groq's free tier for llama-3.1-8b-instant; raise them for paid tiers.
+SUMMARY_MODEL_NAME = "llama-3.1-8b-instant"
+SUMMARY_MAX_TOKENS = 50
+SUMMARY_PROMPT_TOKENS = 150
+SUMMARY_RPM = int(os.getenv("GROQ_SUMMARY_RPM", "30"))
+SUMMARY_TPM = int(os.getenv("GROQ_SUMMARY_TPM", "6000"))
+SUMMARY_MAX_WORKERS = int(os.getenv("SUMMARY_MAX_WORKERS", "8"))
+SUMMARY_RETRIES = int(os.getenv("SUMMARY_RETRIES", "4"))
+# Chunks per packed request (1 disables packing)
+SUMMARY_PACK_SIZE = int(os.getenv("SUMMARY_PACK_SIZE", "8"))
 
 def generate_pdf_id(pdf_url: str)->str:
     """"Generating unique id for pdf"""
@@ -33,12 +48,7 @@ def generate_pdf_id(pdf_url: str)->str:
 
 class CustomEmbedder(Embeddings):
     def embed_documents(self, texts):
-        embeddings=[]
-        for text in texts:
-            result=embed_string_small(text)
-            dense=result["dense_embedding"]
-            embeddings.append(dense)
-        return embeddings
+        return embed_batch_small(texts, use_cache=False)["dense"].tolist()
 
     def embed_query(self, text):
         result=embed_string_small(text)
@@ -71,17 +81,25 @@ class TextPreprocessor:
             visual_chunks = extracted.get("image_chunks", []) + extracted.get("table_chunks", [])
             logging.info(f"Processing {len(visual_chunks)} visual elements with Vision Model...")
             
+            # 1. Keep only chunks that carry Base64
+            visual_chunks = [
+                v for v in visual_chunks
+                if v.get("metadata", {}).get("image_base64")
+            ]
+
+            # 2. Generate Descriptions (parallel, identical payloads captioned once)
+            with stage("llm"), timed("caption", items=len(visual_chunks)):
+                descriptions = describe_images(
+                    [v["metadata"]["image_base64"] for v in visual_chunks]
+                )
+
+            report_progress("captioned", done=len(visual_chunks), total=len(visual_chunks))
+
             processed_visuals = []
             for v_chunk in visual_chunks:
-                # 1. Get Base64
-                base64_data = v_chunk.get("metadata", {}).get("image_base64")
-                if not base64_data:
-                    continue
-                
-                # 2. Generate Description
-                logging.info(f"Generating description for visual chunk {v_chunk['id']}...")
-                description = describe_image(base64_data)
-                
+                base64_data = v_chunk["metadata"]["image_base64"]
+                description = descriptions[hashlib.sha256(base64_data.encode()).hexdigest()]
+
                 # 3. Create a text-like chunk, but keep the base64 in metadata
                 v_chunk["content"] = f"<figure_description>{description}</figure_description>"
                 v_chunk["type"] = "visual" # mark it
@@ -90,9 +108,14 @@ class TextPreprocessor:
             # Combine text and visual chunks - PRIORITIZE VISUALS
             all_raw_chunks = processed_visuals + extracted["text_chunks"]
             
-            merged_chunks = self._token_aware_merge(all_raw_chunks)
-            summary_docs = self._summarize_and_prepare_docs(merged_chunks)
-            vector_store = self._store_in_qdrant(summary_docs)
+            with timed("merge", input_chunks=len(all_raw_chunks)) as t:
+                merged_chunks = self._token_aware_merge(all_raw_chunks)
+                t["items"] = len(merged_chunks)
+            with stage("llm"), timed("summarize") as t:
+                summary_docs = self._summarize_and_prepare_docs(merged_chunks)
+                t["items"] = len(summary_docs)
+            with stage("embed"):
+                vector_store = self._store_in_qdrant(summary_docs)
             logging.info("PDF processing completed successfully.")
             return vector_store
 
@@ -193,15 +216,97 @@ class TextPreprocessor:
         return filtered
 
     # ---------- Summarize (IN MEMORY ONLY) ----------
+    def _call_summarizer(self, text: str, prompt_template, max_token: int) -> str:
+        """One rate-limited summary call; retries 429s and transient errors."""
+        limiter = get_rate_limiter("groq", rpm=SUMMARY_RPM, tpm=SUMMARY_TPM)
+
+        def call():
+            # rough token estimate: ~4 chars per token + prompt + completion
+            limiter.acquire(tokens=len(text) // 4 + SUMMARY_PROMPT_TOKENS + max_token)
+            return groq_llm(text=text,MODEL_NAME=SUMMARY_MODEL_NAME,max_token=max_token,temperature=0.2,prompt_template=prompt_template)
+
+        return retry_with_backoff(call, retries=SUMMARY_RETRIES, limiter=limiter)
+
+    def _summarize_chunk(self, text: str) -> str:
+        return self._call_summarizer(text, BATCH_PROMPT_1, SUMMARY_MAX_TOKENS)
+
+    @staticmethod
+    def _parse_packed_response(response: str) -> dict:
+        """Pull the JSON object out of a packed response (tolerates code fences / chatter)."""
+        match = re.search(r"\{.*\}", response or "", re.DOTALL)
+        if not match:
+            return {}
+        try:
+            parsed = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return {}
+        return parsed if isinstance(parsed, dict) else {}
+
+    def _summarize_pack(self, texts):
+        """
+        Summarize several chunks in one request.
+        Keys are positional ("c0", "c1", ...) because split chunks share chunk_id.
+        Any entry missing or unparsable falls back to a single-chunk call;
+        entries that still fail come back as None.
+        """
+        if len(texts) == 1:
+            return [self._summarize_chunk(texts[0])]
+
+        packed = "\n\n".join(
+            f'<chunk id="c{i}">\n{text}\n</chunk>' for i, text in enumerate(texts)
+        )
+        try:
+            response = self._call_summarizer(
+                packed, PACKED_BATCH_PROMPT, SUMMARY_MAX_TOKENS * len(texts) + 20 * len(texts)
+            )
+            parsed = self._parse_packed_response(response)
+        except Exception as e:
+            logging.warning("Packed summarization failed, falling back to single calls: %s", str(e))
+            parsed = {}
+
+        summaries = []
+        for i, text in enumerate(texts):
+            summary = parsed.get(f"c{i}")
+            if not isinstance(summary, str) or not summary.strip():
+                logging.info("Packed entry c%d missing, summarizing it on its own", i)
+                try:
+                    summary = self._summarize_chunk(text)
+                except Exception as e:
+                    logging.error("Fallback summarization failed for c%d: %s", i, str(e))
+                    summary = None
+            summaries.append(summary.strip() if summary else None)
+        return summaries
+
     def _summarize_and_prepare_docs(self, merged_chunks):
         logging.info("Generating summaries for merged chunks...")
         docs = []
         try:
             merged_chunks=self._limit_chunks_per_section(merged_chunks)
-            for idx, chunk in enumerate(merged_chunks, 1):
-                logging.info("Summarizing chunk %d/%d", idx, len(merged_chunks))
-                
-                summary = groq_llm(text=chunk["text"],MODEL_NAME="llama-3.1-8b-instant",max_token=50,temperature=0.2,prompt_template=BATCH_PROMPT_1)
+            total = len(merged_chunks)
+
+            pack_size = max(1, SUMMARY_PACK_SIZE)
+            packs = [merged_chunks[i:i + pack_size] for i in range(0, total, pack_size)]
+
+            def summarize(indexed):
+                idx, pack = indexed
+                try:
+                    summaries = self._summarize_pack([c["text"] for c in pack])
+                    logging.info("Summarized pack %d/%d (%d chunks)", idx, len(packs), len(pack))
+                    return summaries
+                except Exception as e:
+                    logging.error("Failed to summarize pack %d/%d: %s", idx, len(packs), str(e))
+                    return [None] * len(pack)
+
+            # pool.map keeps input order, so output is deterministic
+            summaries = []
+            with ThreadPoolExecutor(max_workers=SUMMARY_MAX_WORKERS) as pool:
+                for pack_summaries in pool.map(summarize, enumerate(packs, 1)):
+                    summaries.extend(pack_summaries)
+                    report_progress("summarized", done=len(summaries), total=total)
+
+            for chunk, summary in zip(merged_chunks, summaries):
+                if summary is None:
+                    continue
                 docs.append(
                     Document(
                         page_content=summary,
@@ -217,7 +322,6 @@ class TextPreprocessor:
                         }
                     )
                 )
-                time.sleep(0.6)
             logging.info("Summarization completed. Total summary docs: %d", len(docs))
         except Exception as e:
             logging.error("Error during summarization: %s", str(e))
@@ -228,16 +332,14 @@ class TextPreprocessor:
     def _store_in_qdrant(self, docs):
         try:
             logging.info(f"Storing hybrid embeddings for PDF ID: {self.pdf_id}")
-            #step1: get embeddin dimensions
-            test_result=embed_string_small("test")
-            dense_dim=len(test_result["dense_embedding"])
-            logging.info(f"Dense embedding dimension: {dense_dim}")
+            #step1: embedding dimension is fixed by the model
+            dense_dim=DENSE_DIM
             try:
-                client.get_collection(self.collection_name)
+                get_qdrant_client().get_collection(self.collection_name)
                 logging.info(f"Collection '{self.collection_name}' already exists. Bypassing creation.")
             except Exception:
                   logging.info(f"Creating new collection '{self.collection_name}' with hybrid search (Dim: {dense_dim})")
-                  client.create_collection(
+                  get_qdrant_client().create_collection(
                     collection_name=self.collection_name,
                     vectors_config={
                         "dense": VectorParams(
@@ -251,18 +353,24 @@ class TextPreprocessor:
                         )
                     }
                 )
+            #step2: embed every summary in one batched pass
+            logging.info(f"Embedding {len(docs)} documents")
+            # summaries are unique per paper: skip the cache so they don't evict hot queries
+            with timed("embed", items=len(docs)):
+                embeddings = embed_batch_small([doc.page_content for doc in docs], use_cache=False)
+            dense_vectors = embeddings["dense"].tolist()
+            report_progress("embedded", done=len(docs), total=len(docs))
+            blob_store = get_blob_store()
             points=[]
             for idx,doc in enumerate(docs):
-                logging.info(f"Processing document {idx + 1}/{len(docs)}")
-                embedding_result = embed_string_small(doc.page_content)
+                # Images go to the blob store; the payload only keeps the hash
+                image_base64 = doc.metadata.get("image_base64")
+                image_ref = blob_store.put_base64(image_base64) if image_base64 else None
                 point = {
                     "id": str(uuid.uuid4()),
                     "vector": {
-                        "dense": embedding_result["dense_embedding"],
-                        "sparse": {
-                            "indices": embedding_result["sparse_embedding"]["indices"],
-                            "values": embedding_result["sparse_embedding"]["values"]
-                        }
+                        "dense": dense_vectors[idx],
+                        "sparse": sparse_row(embeddings, idx)
                     },
                     "payload": {
                         "page_content": doc.page_content,
@@ -272,7 +380,7 @@ class TextPreprocessor:
                         "section": doc.metadata.get("section"),
                         "source": doc.metadata.get("source"),
                         "type": doc.metadata.get("type"),
-                        "image_base64": doc.metadata.get("image_base64"), # ✅ Persist to Payload
+                        "image_ref": image_ref, # ✅ SHA-256 of the image in the blob store
                         "original_type": doc.metadata.get("original_type")
                     }
                 }
@@ -285,17 +393,19 @@ class TextPreprocessor:
 
             #step 4
             batch_size = 100
-            for i in range(0, len(points), batch_size):
-                batch = points[i:i + batch_size]
-                client.upsert(
-                    collection_name=self.collection_name,
-                    points=batch
-                )
-                logging.info(f"Uploaded batch {i // batch_size + 1}/{(len(points) + batch_size - 1) // batch_size}")
+            with timed("upsert", items=len(points)):
+                for i in range(0, len(points), batch_size):
+                    batch = points[i:i + batch_size]
+                    get_qdrant_client().upsert(
+                        collection_name=self.collection_name,
+                        points=batch
+                    )
+                    logging.info(f"Uploaded batch {i // batch_size + 1}/{(len(points) + batch_size - 1) // batch_size}")
+                    report_progress("stored", done=min(i + batch_size, len(points)), total=len(points))
             
             # Step 5: Create LangChain wrapper (for compatibility, optional)
             vector_store = QdrantVectorStore(
-                client=client,
+                client=get_qdrant_client(),
                 collection_name=self.collection_name,
                 embedding=self.embedder,
                 vector_name="dense",
@@ -7,6 +7,8 @@ import time
 import gc
 from typing import Dict, List
 from unstructured.partition.pdf import partition_pdf
+from Backend.workers.stages import stage
+from Backend.workers.progress import report_progress, timed
 from unstructured.documents.elements import (
     NarrativeText,
     Title,
@@ -102,16 +104,20 @@ class DocumentChunkExtractor:
         other_chunks = []
 
         # ---- DOWNLOAD PDF TEMPORARILY ----
-        tmp_dir = r"C:/Users/nshej/aisearch"
-        os.makedirs(tmp_dir, exist_ok=True)  # ensure folder exists
-        tmp_path = os.path.join(tmp_dir, "tmp_arxiv.pdf")
+        # Unique file per job: several workers may extract at the same time
+        fd, tmp_path = tempfile.mkstemp(prefix="tmp_arxiv_", suffix=".pdf")
+        os.close(fd)
         
         # Download PDF
         try:
-            response = requests.get(self.pdf_url)
-            response.raise_for_status()
+            with stage("download"), timed("download") as t:
+                response = requests.get(self.pdf_url)
+                response.raise_for_status()
+                t["bytes"] = len(response.content)
+            report_progress("downloaded", bytes=len(response.content))
         except Exception as e:
             print(f"❌ Failed to download PDF: {e}")
+            self._safe_delete(tmp_path)
             return {
                 "text_chunks": [],
                 "image_chunks": [],
@@ -127,6 +133,7 @@ class DocumentChunkExtractor:
             
         except Exception as e:
             print(f"❌ Failed to write PDF: {e}")
+            self._safe_delete(tmp_path)
             return {
                 "text_chunks": [],
                 "image_chunks": [],
@@ -137,14 +144,16 @@ class DocumentChunkExtractor:
         # ---- PDF PARTITION (file is closed now) ----
         elements = None
         try:
-            elements = partition_pdf(
-                filename=tmp_path,
-                strategy="hi_res",
-                extract_image_block_types=["Image", "Table"],  # Capture both images and tables as images
-                extract_image_block_to_payload=True,           # Extract Base64
-                infer_table_structure=True,
-                ocr=self.ocr,
-            )
+            with stage("parse"), timed("partition") as t:
+                elements = partition_pdf(
+                    filename=tmp_path,
+                    strategy="hi_res",
+                    extract_image_block_types=["Image", "Table"],  # Capture both images and tables as images
+                    extract_image_block_to_payload=True,           # Extract Base64
+                    infer_table_structure=True,
+                    ocr=self.ocr,
+                )
+                t["items"] = len(elements)
         except Exception as e:
             print(f"❌ PDF partition failed: {e}")
             return {
@@ -162,6 +171,8 @@ class DocumentChunkExtractor:
             # Safe deletion with retry logic
             self._safe_delete(tmp_path)
 
+        report_progress("parsed", elements=len(elements_copy))
+
         # ---- PROCESS ELEMENTS ----
         current_section = "Introduction"
 
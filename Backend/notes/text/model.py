@@ -2,9 +2,10 @@
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
 import os
+import threading
 from dotenv import load_dotenv
+from Backend.models.registry import get_model
 
 load_dotenv("C:/Users/nshej/aisearch/.env")
 
@@ -99,29 +100,37 @@ final_prompt = ChatPromptTemplate.from_template(final_synthesis_prompt)
 # ----------------------------
 # MODEL CONFIGURATION
 # ----------------------------
-model = ChatGroq(
-    temperature=0.1,  # Lower temperature for more focused output
-    model="llama-3.3-70b-versatile"  # Best for structured academic notes
-)
+# The Groq chat model ("notes_llm": llama-3.3-70b-versatile, temperature 0.1) comes
+# from the model registry; chains are built on first use, not at import.
 
 # ----------------------------
 # CHAINS
 # ----------------------------
-# Stage 1: Batch extraction (condense chunks)
-batch_chain = (
-    {"element": lambda x: x}
-    | batch_prompt
-    | model
-    | StrOutputParser()
-)
-
-# Stage 2: Final synthesis (create structured notes)
-final_chain = (
-    {"element": lambda x: x}
-    | final_prompt
-    | model
-    | StrOutputParser()
-)
+_chains = {}
+_chains_lock = threading.Lock()
+
+
+def _get_chain(name, prompt):
+    with _chains_lock:
+        if name not in _chains:
+            _chains[name] = (
+                {"element": lambda x: x}
+                | prompt
+                | get_model("notes_llm")
+                | StrOutputParser()
+            )
+        return _chains[name]
+
+
+def get_batch_chain():
+    """Stage 1: Batch extraction (condense chunks)"""
+    return _get_chain("batch", batch_prompt)
+
+
+def get_final_chain():
+    """Stage 2: Final synthesis (create structured notes)"""
+    return _get_chain("final", final_prompt)
+
 
 # Legacy name for backward compatibility
-summarize_chain = batch_chain
\ No newline at end of file
+get_summarize_chain = get_batch_chain
\ No newline at end of file
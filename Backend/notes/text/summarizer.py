@@ -9,13 +9,17 @@ from Backend.models.prompts import NOTES_PROMPT,VALIDATION_PROMPT,FINAL_NOTES_PR
 from Backend.notes.text.chunks_embeddings import TextPreprocessor, CustomEmbedder, generate_pdf_id
 from langchain_qdrant import QdrantVectorStore
 from Backend.database.qdrant_client import get_qdrant_client, get_collection_name
+from Backend.database.blob_store import get_blob_store
 from qdrant_client.models import (
     QueryRequest, VectorInput, SparseVector, 
     Prefetch, Filter, FieldCondition, MatchValue,  PayloadSchemaType,FusionQuery,
     Fusion,
 )
-from Backend.notes.text.model import batch_chain
-from Backend.embedding.embed_local import embed_string_small
+from Backend.notes.text.model import get_batch_chain
+from Backend.embedding.embed_local import embed_string_small, embed_batch_small, sparse_row
+from Backend.workers.stages import stage
+from Backend.workers.progress import report_progress, timed
+import threading
 
 # ----------------------------
 # Logging Configuration
@@ -26,15 +30,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
 # ----------------------------
-# Qdrant Client - Centralized
+# Retrieval Queries (fixed for every notes job)
 # ----------------------------
-try:
-    client = get_qdrant_client()
-    logger.info("Connected to Qdrant successfully")
-except Exception as e:
-    logger.exception("Failed to connect to Qdrant")
-    raise e
+RETRIEVAL_QUERIES = [
+    "Problem definition and motivation",
+    "Algorithm description and methodology",
+    "Mathematical formulation and equations",
+    "Experimental setup datasets and baselines",
+    "Results metrics accuracy F1 runtime",
+    "Limitations and future work",
+    "Related work and referenced methods"
+]
+
+# Payload fields consumed by _points_to_documents (+ original_type for the legacy image check)
+NOTES_PAYLOAD_FIELDS = [
+    "page_content", "pdf_id", "pdf_url", "chunk_id", "section", "source", "type",
+    "image_ref", "original_type",
+]
+
+_retrieval_query_embeddings = None
+_retrieval_query_lock = threading.Lock()
+
+
+def get_retrieval_query_embeddings() -> dict:
+    """
+    Dense + BM25 vectors for RETRIEVAL_QUERIES, computed once per process.
+    Backed by the on-disk embedding cache, so restarts load them instead of re-encoding.
+    """
+    global _retrieval_query_embeddings
+    with _retrieval_query_lock:
+        if _retrieval_query_embeddings is None:
+            _retrieval_query_embeddings = embed_batch_small(RETRIEVAL_QUERIES)
+            logger.info(f"✅ Retrieval query embeddings ready ({len(RETRIEVAL_QUERIES)} queries)")
+        return _retrieval_query_embeddings
 
 
 # ----------------------------
@@ -48,7 +78,7 @@ def ensure_collection_exists(pdf_url: str, collection_name: str):
         pdf_id = generate_pdf_id(pdf_url)
         
         # Check if collection exists
-        collections = client.get_collections().collections
+        collections = get_qdrant_client().get_collections().collections
         existing = [c.name for c in collections]
 
         if collection_name not in existing:
@@ -64,14 +94,14 @@ def ensure_collection_exists(pdf_url: str, collection_name: str):
 
         # Collection exists - check if this PDF is already embedded
         
-        client.create_payload_index(
+        get_qdrant_client().create_payload_index(
                     collection_name=collection_name,
                     field_name="pdf_id",
                     field_schema=PayloadSchemaType.KEYWORD
         )
-        collection_info = client.get_collection(collection_name)
+        collection_info = get_qdrant_client().get_collection(collection_name)
         # Try to find points with this pdf_id
-        search_result = client.scroll(
+        search_result = get_qdrant_client().scroll(
             collection_name=collection_name,
             scroll_filter=Filter(
                 must=[
@@ -81,7 +111,8 @@ def ensure_collection_exists(pdf_url: str, collection_name: str):
                     )
                 ]
             ),
-            limit=1
+            limit=1,
+            with_payload=False  # existence check only
         )
         points, _ = search_result
         if len(points) > 0:  # Points found for this PDF
@@ -128,7 +159,7 @@ def hybrid_search_for_pdf(query: str, pdf_id: str, collection_name: str, k: int
         )
         
         # Perform hybrid search with filter
-        search_results = client.query_points(
+        search_results = get_qdrant_client().query_points(
             collection_name=collection_name,
             prefetch=[
                 Prefetch(
@@ -148,31 +179,17 @@ def hybrid_search_for_pdf(query: str, pdf_id: str, collection_name: str, k: int
                 )
             ],
             query=FusionQuery(fusion=Fusion.RRF), #This query takes object not dict 
-            limit=k
+            limit=k,
+            with_payload=NOTES_PAYLOAD_FIELDS  # images resolved lazily via image_ref
         )
         
         # Convert to LangChain Document format
-        documents = []
-        for point in search_results.points:
-            payload = point.payload or {}
-            doc = Document(
-                page_content=payload.get("page_content", ""),
-                metadata={
-                    "pdf_id": payload.get("pdf_id"),
-                    "pdf_url": payload.get("pdf_url"),
-                    "chunk_id": payload.get("chunk_id"),
-                    "section": payload.get("section"),
-                    "source": payload.get("source"),
-                    "type": payload.get("type"),
-                    "image_base64": payload.get("image_base64") # ✅ Retrieve Base64
-                }
-            )
-            documents.append(doc)
+        documents = _points_to_documents(search_results.points)
         
         logger.info(f"✅ Found {len(documents)} chunks for PDF ID: {pdf_id}")
-        # Debug: Check if any chunk has image_base64
-        visual_count = sum(1 for d in documents if d.metadata.get("image_base64"))
-        logger.info(f"🔍 Chunks with image_base64: {visual_count}")
+        # Debug: Check if any chunk references an image
+        visual_count = sum(1 for d in documents if d.metadata.get("image_ref"))
+        logger.info(f"🔍 Chunks with image_ref: {visual_count}")
         return documents
         
     except Exception as e:
@@ -180,6 +197,102 @@ def hybrid_search_for_pdf(query: str, pdf_id: str, collection_name: str, k: int
         return []
 
 
+def _points_to_documents(points):
+    """Convert Qdrant points to LangChain Documents."""
+    documents = []
+    for point in points:
+        payload = point.payload or {}
+        doc = Document(
+            page_content=payload.get("page_content", ""),
+            metadata={
+                "pdf_id": payload.get("pdf_id"),
+                "pdf_url": payload.get("pdf_url"),
+                "chunk_id": payload.get("chunk_id"),
+                "section": payload.get("section"),
+                "source": payload.get("source"),
+                "type": payload.get("type"),
+                "image_ref": payload.get("image_ref"), # ✅ Blob store reference
+                "image_base64": payload.get("image_base64") # legacy points stored it inline
+            }
+        )
+        documents.append(doc)
+    return documents
+
+
+def hybrid_search_multi_for_pdf(query_embeddings: dict, pdf_id: str, collection_name: str, k: int = 30):
+    """
+    Run several hybrid searches against ONE PDF in a single Qdrant round trip.
+
+    Points are deduplicated by point id across all queries (first hit wins,
+    in query then rank order). Only NOTES_PAYLOAD_FIELDS are returned by
+    the search; images are referenced by image_ref and resolved lazily.
+    Legacy points that still store the image inline get it fetched once.
+
+    Args:
+        query_embeddings: embed_batch_small result, one row per query
+    Returns:
+        Unique Documents across all queries
+    """
+    pdf_filter = Filter(
+        must=[
+            FieldCondition(
+                key="pdf_id",
+                match=MatchValue(value=pdf_id)
+            )
+        ]
+    )
+
+    requests = []
+    for i, dense in enumerate(query_embeddings["dense"].tolist()):
+        sparse = sparse_row(query_embeddings, i)
+        requests.append(
+            QueryRequest(
+                prefetch=[
+                    Prefetch(query=dense, using="dense", limit=k, filter=pdf_filter),
+                    Prefetch(
+                        query=SparseVector(indices=sparse["indices"], values=sparse["values"]),
+                        using="sparse",
+                        limit=k,
+                        filter=pdf_filter
+                    ),
+                ],
+                query=FusionQuery(fusion=Fusion.RRF),
+                limit=k,
+                with_payload=NOTES_PAYLOAD_FIELDS,
+            )
+        )
+
+    responses = get_qdrant_client().query_batch_points(collection_name=collection_name, requests=requests)
+
+    # Dedupe by point id on the raw response
+    unique_points = {}
+    for response in responses:
+        for point in response.points:
+            unique_points.setdefault(point.id, point)
+    logger.info(
+        f"Batched retrieval: {sum(len(r.points) for r in responses)} hits, {len(unique_points)} unique points"
+    )
+
+    # Legacy points (no image_ref): fetch inline image_base64 once per unique non-text chunk
+    visual_ids = [
+        pid for pid, point in unique_points.items()
+        if (point.payload or {}).get("original_type") != "text"
+        and "image_ref" not in (point.payload or {})
+    ]
+    if visual_ids:
+        for record in get_qdrant_client().retrieve(
+            collection_name=collection_name,
+            ids=visual_ids,
+            with_payload=["image_base64"],
+            with_vectors=False,
+        ):
+            image = (record.payload or {}).get("image_base64")
+            if image:
+                unique_points[record.id].payload["image_base64"] = image
+
+    return _points_to_documents(unique_points.values())
+
+
 # ----------------------------
 # Helper: Batch Extraction (Stage 1)
 # ----------------------------
@@ -197,7 +310,7 @@ def batch_extract_chunks(chunks, batch_size=15):
             batch = chunks[i * batch_size:(i + 1) * batch_size]
             batch_text = "\n\n---\n\n".join([c.page_content for c in batch])
 
-            extraction = batch_chain.invoke(batch_text)
+            extraction = get_batch_chain().invoke(batch_text)
             extractions.append(extraction)
 
             logger.info(f"✅ Extracted batch {i + 1}/{total_batches}")
@@ -291,35 +404,26 @@ def generate_notes_from_pdf(pdf_url: str):
         raise e
 
     # ----------------------------
-    # Retrieval Queries (Filtered by PDF ID)
+    # Retrieval Queries (Filtered by PDF ID) - one batched round trip
     # ----------------------------
-    RETRIEVAL_QUERIES = [
-        "Problem definition and motivation",
-        "Algorithm description and methodology",
-        "Mathematical formulation and equations",
-        "Experimental setup datasets and baselines",
-        "Results metrics accuracy F1 runtime",
-        "Limitations and future work",
-        "Related work and referenced methods"
-    ]
-
     all_chunks = []
 
-    for query in RETRIEVAL_QUERIES:
-        try:
-            logger.info(f"Performing hybrid search for query: '{query}'")
-            retrieved = hybrid_search_for_pdf(
-                query=query,
+    try:
+        logger.info(f"Performing batched hybrid search for {len(RETRIEVAL_QUERIES)} queries")
+        with timed("retrieve") as t:
+            retrieved = hybrid_search_multi_for_pdf(
+                query_embeddings=get_retrieval_query_embeddings(),
                 pdf_id=pdf_id,  # ← Filter by this PDF only
                 collection_name=get_collection_name("pdf_vectors_v2"),
                 k=75
             )
-            all_chunks.extend(retrieved)
-            logger.info(f"✅ Retrieved {len(retrieved)} chunks")
+            t["items"] = len(retrieved)
+        all_chunks.extend(retrieved)
+        logger.info(f"✅ Retrieved {len(retrieved)} unique chunks")
+        report_progress("retrieved", chunks=len(retrieved))
 
-        except Exception as e:
-            logger.exception(f"Failed retrieval for query: {query}")
-            continue
+    except Exception as e:
+        logger.exception("Batched retrieval failed")
 
     # ----------------------------
     # Deduplication
@@ -350,11 +454,13 @@ def generate_notes_from_pdf(pdf_url: str):
         logger.info("=" * 50)
         logger.info("STAGE 1: Extracting key information from chunks")
         logger.info("=" * 50)
+        report_progress("extracting", total=len(unique_chunks))
 
-        batch_extractions = batch_extract_chunks(
-            unique_chunks,
-            batch_size=batch_size
-        )
+        with stage("llm"), timed("extract", items=len(unique_chunks)):
+            batch_extractions = batch_extract_chunks(
+                unique_chunks,
+                batch_size=batch_size
+            )
 
         logger.info(f"✅ Stage 1 Complete: {len(batch_extractions)} extractions")
 
@@ -369,24 +475,34 @@ def generate_notes_from_pdf(pdf_url: str):
         logger.info("=" * 50)
         logger.info("STAGE 2: Synthesizing structured notes")
         logger.info("=" * 50)
+        report_progress("writing_notes")
 
         # Merge all extractions
         merged_extractions = "\n\n=== CHUNK ===\n\n".join(batch_extractions)
 
         # Use final_chain for structured synthesis
-        final_notes = generate_final_notes_with_validation(
-            merged_extractions=merged_extractions,
-            max_iterations=2
-        )
+        with stage("llm"), timed("final_notes"):
+            final_notes = generate_final_notes_with_validation(
+                merged_extractions=merged_extractions,
+                max_iterations=2
+            )
 
 
         logger.info(f"✅ Stage 2 Complete: Final notes generated for PDF ID: {pdf_id}")
         # Collect visuals
         visuals = []
         seen_visuals = set()
+        blob_store = get_blob_store()
         for c in unique_chunks:
-            b64 = c.metadata.get("image_base64")
-            if b64 and b64 not in seen_visuals:
+            if len(visuals) >= 5: # Return top 5 visuals
+                break
+            image_ref = c.metadata.get("image_ref")
+            key = image_ref or c.metadata.get("image_base64")
+            if key and key not in seen_visuals:
+                # Only the visuals we return are loaded from the blob store
+                b64 = blob_store.get_base64(image_ref) if image_ref else c.metadata.get("image_base64")
+                if not b64:
+                    continue
                 # Extract description from <figure_description> tags if present
                 content = c.page_content
                 description = content
@@ -395,17 +511,18 @@ def generate_notes_from_pdf(pdf_url: str):
 
                 visuals.append({
                     "type": "image",
+                    "image_ref": image_ref,
                     "base64": b64,
                     "caption": description[:100] + "..." if len(description) > 100 else description,
                     "description": description
                 })
-                seen_visuals.add(b64)
+                seen_visuals.add(key)
 
         logger.info(f"✅ Stage 2 Complete: Final notes generated for PDF ID: {pdf_id}")
         
         return {
             "notes": final_notes,
-            "visuals": visuals[:5] # Return top 5 visuals
+            "visuals": visuals
         }
 
     except Exception as e:
@@ -0,0 +1,53 @@
+"""Route handlers for operational metrics and readiness."""
+import logging
+from fastapi import APIRouter, Response
+
+from Backend.database.job_store import get_job_store
+from Backend.embedding.cache import get_embedding_cache
+from Backend.search.cache import get_search_cache
+from Backend.models.expansion_cache import get_expansion_cache
+from Backend.utils.metrics import get_metrics, summarize_job_timings
+from Backend.models.registry import get_registry, API_MODELS
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("/metrics")
+def metrics(recent_jobs: int = 200):
+    """
+    Pipeline and process metrics.
+
+    - pipeline: per-stage seconds (p50 / p95 / max) and throughput over the most
+      recent jobs, plus the slowest jobs and the stage that dominated each one.
+      Read from the job records, so it covers jobs run by any worker process.
+    - process: observations recorded in this API process
+    - caches: hit rates of the caches this process uses
+    - models: per (model, backend) instance in this process: load time, RSS growth
+      while loading, and which roles share it
+    """
+    records = get_job_store().recent_timings(limit=max(1, min(recent_jobs, 1000)))
+    return {
+        "pipeline": summarize_job_timings(records),
+        "process": get_metrics().snapshot(),
+        "caches": {
+            "embedding": get_embedding_cache().stats(),
+            "search": get_search_cache().stats(),
+            "expansion": get_expansion_cache().stats(),
+        },
+        "models": get_registry().status(),
+    }
+
+
+@router.get("/ready")
+def ready(response: Response):
+    """
+    Readiness probe: 200 once every model the API serves with is loaded, 503 before.
+    The server accepts traffic (and /health-style probes) while models warm up
+    in the background; requests that arrive early load what they need on demand.
+    """
+    registry = get_registry()
+    is_ready = registry.is_ready(API_MODELS)
+    if not is_ready:
+        response.status_code = 503
+    return {"ready": is_ready, "models": registry.status()}
@@ -1,20 +1,22 @@
 """Route handlers for search endpoints."""
+import os
+import time
 import asyncio
 import logging
-import uuid
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse, Response
 from typing import Optional, AsyncGenerator
 
-from Backend.ingestion.extraction import extract_text_for_search, enhance_text_query
-from Backend.embedding.embedd import embed_string
-from Backend.search.service import SearchService
-from Backend.notes.text.chunks_embeddings import TextPreprocessor
-from Backend.notes.Visual.image_table_extractor import ImageTableExtractor
-from Backend.notes.text.summarizer import generate_notes_from_pdf
-from Backend.chat.start_chat_pipeline import prepare_chat
-from Backend.chat.chat import hybrid_search_for_pdf, qa_chain
+from Backend.ingestion.extraction import extract_text_for_search, aenhance_text_query, detect_author
+from Backend.embedding.inference import aembed_string
+from Backend.search.service import SearchService, reciprocal_rank_fusion
+from Backend.search.cache import get_search_cache
+from Backend.chat.chat import prepare_answer, qa_chain
 from Backend.database.qdrant_client import get_collection_name
+from Backend.database.job_store import get_job_store
+from Backend.database.job_events import get_job_event_hub
+from Backend.utils.metrics import get_metrics
+from Backend.database.blob_store import get_blob_store, is_valid_ref, guess_image_media_type
 # Pydantic schemas
 from Backend.schemas.requests import (
     SearchTextRequest,
@@ -33,10 +35,39 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 search_service = SearchService()
 
+SEARCH_LIMIT = 20  # results per text search
+# How long /search_text waits for the LLM query expansion (0 = always wait for it)
+EXPANSION_DEADLINE_MS = float(os.getenv("EXPANSION_DEADLINE_MS", "800"))
+# Fuse raw-query and expanded-query results (RRF) instead of using the expanded ones alone
+FUSE_EXPANDED_RESULTS = os.getenv("FUSE_EXPANDED_RESULTS", "true").lower() == "true"
+
+# How long a chat message waits for its session's preparation job
+CHAT_READY_TIMEOUT_SECONDS = float(os.getenv("CHAT_READY_TIMEOUT_SECONDS", "300"))
+
 #-------------------------------#
 #Schema
 #-------------------------------
 
+async def _await_expansion(expansion: asyncio.Task) -> Optional[dict]:
+    """The expansion if it finishes within the budget, else None (it keeps running to warm the cache)."""
+    try:
+        if EXPANSION_DEADLINE_MS <= 0:
+            enhanced = await expansion
+        else:
+            enhanced = await asyncio.wait_for(asyncio.shield(expansion), timeout=EXPANSION_DEADLINE_MS / 1000)
+        return enhanced if enhanced.get("enhanced_text") else None
+    except asyncio.TimeoutError:
+        logger.info(f"⏱️ Query expansion missed the {EXPANSION_DEADLINE_MS:.0f}ms budget, answering with the raw query")
+    except Exception as e:
+        logger.warning(f"⚠️ Query expansion failed, answering with the raw query: {e}")
+    return None
+
+
+def _search_response(results: list, query_path: str, start: float) -> dict:
+    get_metrics().observe(f"search.{query_path}.ms", (time.perf_counter() - start) * 1000)
+    return {"results": results, "query_path": query_path}
+
+
 @router.post("/search_text", response_model=SearchResponse)
 async def search_text(request: SearchTextRequest):
     """
@@ -45,26 +76,74 @@ async def search_text(request: SearchTextRequest):
     What changed:
     - Now uses SearchTextRequest (validates query length)
     - Added response_model for consistent output
-    - All logic stays the same!
+    - Results are cached: repeated (and, optionally, near-duplicate) queries
+      skip query expansion, embedding and Qdrant
+    - Latency budget: the raw query is searched right away while the LLM
+      expansion runs; the expansion is only used if it arrives within
+      EXPANSION_DEADLINE_MS (fused with the raw results by default)
+    - query_path in the response says which of these answered
     """
     try:
-        # Enhance query and extract author if present (same as before)
-        enhanced = enhance_text_query(request.query)
-        author = enhanced.get("author")
-        embeddings = embed_string(enhanced["enhanced_text"])
-
-        dense_embedding = embeddings["dense_embedding"]
-        sparse_embedding = embeddings["sparse_embedding"]
-        
-        # Search with optional author filter (same as before)
-        results = search_service.search(
-            dense_embedding=dense_embedding,
-            sparse_embedding=sparse_embedding,
-            limit=20,
-            author_filter=author
-        )
-        
-        return {"results": results}
+        start = time.perf_counter()
+        cache = get_search_cache()
+        await cache.check_version()
+        # the author filter is case-sensitive but the cache key is lowercased, so it's part of the key
+        author = detect_author(request.query)
+        cache_key = cache.key(request.query, limit=SEARCH_LIMIT, author=author)
+        results = cache.get(cache_key)
+        if results is not None:
+            return _search_response(results, "cache", start)
+
+        # Expansion starts first: it is the slow part, everything below overlaps with it
+        expansion = asyncio.create_task(aenhance_text_query(request.query))
+        # it may outlive this request: retrieve its exception so it is never reported as unhandled
+        expansion.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+        raw_search = None
+        try:
+            # forward pass runs on the inference executor, batched with concurrent searches
+            raw_embeddings = await aembed_string(request.query)
+            if cache.semantic_enabled:
+                results = cache.get_similar(cache_key, raw_embeddings["dense_embedding"])
+                if results is not None:
+                    # the expansion keeps running and warms the expansion cache
+                    return _search_response(results, "semantic_cache", start)
+
+            # Search with optional author filter (async client: doesn't block the event loop)
+            raw_search = asyncio.create_task(search_service.asearch(
+                dense_embedding=raw_embeddings["dense_embedding"],
+                sparse_embedding=raw_embeddings["sparse_embedding"],
+                limit=SEARCH_LIMIT,
+                author_filter=author
+            ))
+
+            enhanced = await _await_expansion(expansion)
+            if enhanced is None:
+                # degraded answer: not cached, so the query gets expanded results next time
+                return _search_response(await raw_search, "raw", start)
+
+            embeddings = await aembed_string(enhanced["enhanced_text"])
+            expanded_results = await search_service.asearch(
+                dense_embedding=embeddings["dense_embedding"],
+                sparse_embedding=embeddings["sparse_embedding"],
+                limit=SEARCH_LIMIT,
+                author_filter=author
+            )
+            if FUSE_EXPANDED_RESULTS:
+                results, path = reciprocal_rank_fusion([expanded_results, await raw_search], SEARCH_LIMIT), "fused"
+            else:
+                raw_search.cancel()
+                results, path = expanded_results, "expanded"
+
+            cache.put(cache_key, results, raw_embeddings["dense_embedding"])
+            return _search_response(results, path, start)
+        except BaseException:
+            # nothing will await the fan-out any more: cancel it and retrieve its outcome
+            tasks = [task for task in (expansion, raw_search) if task is not None]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
     
     except ValueError as e:
         # Handle validation or processing errors
@@ -101,12 +180,12 @@ async def upload(file: UploadFile = File(...)):
         # Step 3: Handle the dict return
         # Option A: If your function returns dict with summary and embedding
         summary_text = result
-        embeddings= embed_string(summary_text)
+        embeddings = await aembed_string(summary_text)
         dense_embedding = embeddings["dense_embedding"]
         sparse_embedding = embeddings["sparse_embedding"]
     
     # Search with optional author filter
-        results = search_service.search(dense_embedding=dense_embedding,sparse_embedding=sparse_embedding, limit=5)
+        results = await search_service.asearch(dense_embedding=dense_embedding,sparse_embedding=sparse_embedding, limit=5)
       # Fixed: serarch -> search
         
         return {"results":results}
@@ -118,41 +197,13 @@ async def upload(file: UploadFile = File(...)):
 
 
 
-def run_notes_job(job_id,vector_index):
-    try:
-        """Generate short notes for a selected paper by its vector index."""
-        #getting metadata and full text pdf from vector index
-        metadata=search_service.get_metadata_by_id(vector_index)
-        if not metadata:
-            return {"error": "Paper not found"}
-        
-        # Get PDF URL
-        pdf_url = metadata.get('download_url', '')
-        if not pdf_url:
-            return {"error": "No PDF URL available"}
-            
-        # result is now { "notes": ..., "visuals": ... }
-        output = generate_notes_from_pdf(pdf_url=pdf_url)
-        
-        JOBS[job_id] = {
-            "status": "done",
-            "result": {
-                "extracted_text": output["notes"],
-                "visuals": output["visuals"],
-                "papermetadata": metadata
-            }
-        }
-    except Exception as e:
-        JOBS[job_id] = {"status": "error", "error": str(e)}
-    finally:
-        ACTIVE_JOBS.pop(vector_index, None)  # ✅ important
-
 #--------------------------------
 # NOTES GENERATION ENDPOINTS
 #--------------------------------
 
-JOBS = {}
-ACTIVE_JOBS = {}
+# Job state and the work queue live in the shared job store (SQLite by default),
+# resolved per request so importing the router never opens it.
+# The pipelines themselves run in Backend.workers.runner, never on the API threadpool.
 
 
 @router.get("/job-status/{job_id}", response_model=JobStatusResponse)
@@ -161,110 +212,94 @@ def job_status(job_id: str):
     Check status of a notes generation job.
     
     What this does:
-    - Returns job status from JOBS dict (same as before)
+    - Returns job status from the job store
     - Now uses JobStatusResponse for consistent format
     """
-    return JOBS.get(job_id, {"status": "not_found"})
+    return get_job_store().get(job_id) or {"status": "not_found"}
+
+
+@router.get("/job-events/{job_id}")
+async def job_events(job_id: str):
+    """
+    Server-Sent Events stream of a notes or chat job.
+    Pushes the job state on every change (including stage progress) and
+    closes after the final "done" / "error" state, so clients don't poll.
+    """
+    return StreamingResponse(
+        get_job_event_hub().stream(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.post("/start_short_notes", response_model=JobInitResponse)
-async def start_notes(
-    request: StartNotesRequest,
-    bg: BackgroundTasks = BackgroundTasks(),
-):
+async def start_notes(request: StartNotesRequest):
     """
     Start generating notes for a paper.
     
     What changed:
     - Now uses StartNotesRequest (validates vector_index)
     - Added response_model
-    - Logic stays exactly the same!
+    - Dedupe is atomic in the job store, so concurrent workers share one job
+    - The job is queued for the worker instead of running as a BackgroundTask
     """
     vector_index = request.vector_index
     
     # ✅ If job already exists, reuse it (same as before)
-    if vector_index in ACTIVE_JOBS:
-        job_id = ACTIVE_JOBS[vector_index]
-        return {"job_id": job_id}
-
-    job_id = str(uuid.uuid4())
-    ACTIVE_JOBS[vector_index] = job_id
-    JOBS[job_id] = {"status": "running"}
-
-    bg.add_task(run_notes_job, job_id, vector_index)
+    job_id, _ = get_job_store().create_or_get(
+        "notes", vector_index, {"status": "running"},
+        payload={"vector_index": vector_index},
+    )
 
     return {"job_id": job_id}
 
 
-#################################
-#-------------- CHAT ENDPOINT ---------
-##################################
-CHAT_JOBS = {}
-ACTIVE_CHAT_JOBS = {}
+@router.get("/visuals/{image_ref}")
+def get_visual(image_ref: str):
+    """
+    Fetch a figure/table image on demand by its blob store reference.
+    Blobs are content-addressed, so responses are cacheable forever.
+    """
+    if not is_valid_ref(image_ref):
+        raise HTTPException(status_code=400, detail="Invalid image reference")
 
-def prepare_chat_pipeline(chat_session_id: str, vector_index: str):
-    try:
-        metadata = search_service.get_metadata_by_id(vector_index)
-        if not metadata:
-            CHAT_JOBS[chat_session_id] = {
-                "status": "error",
-                "error": "Paper not found"
-            }
-            return
-
-        pdf_url = metadata.get("download_url")
-        if not pdf_url:
-            CHAT_JOBS[chat_session_id] = {
-                "status": "error",
-                "error": "No PDF URL available"
-            }
-            return
-
-        result = prepare_chat(pdf_url=pdf_url)
-
-        CHAT_JOBS[chat_session_id] = {
-            "status": "done",
-            "pdf_id": result["pdf_id"],   # ✅ store here
-        }
+    data = get_blob_store().get(image_ref)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Image not found")
 
-    except Exception as e:
-        CHAT_JOBS[chat_session_id] = {
-            "status": "error",
-            "error": str(e)
-        }
+    return Response(
+        content=data,
+        media_type=guess_image_media_type(data),
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
 
-    finally:
-        ACTIVE_CHAT_JOBS.pop(vector_index, None)
 
+#################################
+#-------------- CHAT ENDPOINT ---------
+##################################
 @router.get("/chat-job-status/{chat_session_id}")
 def chat_job_status(chat_session_id: str):
-    return CHAT_JOBS.get(chat_session_id, {"status": "not_found"})
+    return get_job_store().get(chat_session_id) or {"status": "not_found"}
 
 
 
 @router.post("/init_chat", response_model=ChatSessionResponse)
-async def init_chat(
-    request: InitChatRequest,
-    bg: BackgroundTasks = BackgroundTasks()
-):
+async def init_chat(request: InitChatRequest):
     """
     Initialize chat session for a paper.
     
     What changed:
     - Now uses InitChatRequest (validates vector_index)
     - Added response_model
-    - Logic stays the same!
+    - Dedupe is atomic in the job store, so concurrent workers share one job
+    - Queued in the high-priority (interactive) worker lane
     """
     vector_index = request.vector_index
     
-    if vector_index in ACTIVE_CHAT_JOBS:
-        return {"chat_session_id": ACTIVE_CHAT_JOBS[vector_index]}
-
-    chat_session_id = str(uuid.uuid4())
-    ACTIVE_CHAT_JOBS[vector_index] = chat_session_id
-    CHAT_JOBS[chat_session_id] = {"status": "processing"}
-
-    bg.add_task(prepare_chat_pipeline, chat_session_id, vector_index)
+    chat_session_id, _ = get_job_store().create_or_get(
+        "chat", vector_index, {"status": "processing"},
+        payload={"vector_index": vector_index},
+    )
     return {"chat_session_id": chat_session_id}
 
 
@@ -276,44 +311,75 @@ async def chat_message(chat_id: str, request: ChatMessageRequest):
     What changed:
     - Now uses ChatMessageRequest (validates message)
     - Replaced print() with logger.info()
-    - Logic stays exactly the same!
+    - Waits for chat preparation via the job event hub (with a timeout) instead of polling
+    - Retrieval and query expansion run concurrently (expansion only when worthwhile)
+      before the response starts, so the stream opens with the first LLM token
+    - Server-Timing header with the duration of every stage before the stream;
+      time to first token and stream duration are recorded in /metrics
     """
+    start = time.perf_counter()
+    timings = {}
 
-    async def wait_for_chat_done():
-        """Wait until the chat job status becomes 'done'."""
-        while True:
-            chat_state = CHAT_JOBS.get(chat_id)
-            if not chat_state:
-                raise HTTPException(status_code=404, detail="Chat session not found")
-            if chat_state.get("status") == "done":
-                return chat_state
-            await asyncio.sleep(0.5)
+    # Wait for preparation before the response starts, so failures are still real HTTP errors.
+    # The hub wakes us when the job changes; no per-request polling.
+    try:
+        chat_state = await get_job_event_hub().wait_for(chat_id, timeout=CHAT_READY_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Chat session is still being prepared")
+    if not chat_state:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    if chat_state.get("status") == "error":
+        raise HTTPException(status_code=500, detail=f"Chat preparation failed: {chat_state.get('error')}")
+    pdf_id = chat_state["pdf_id"]
+    timings["session"] = (time.perf_counter() - start) * 1000
+
+    prepared = await prepare_answer(
+        request.message,
+        pdf_id=pdf_id,
+        collection_name=get_collection_name("pdf_vectors_v2"),
+        k=100
+    )
+    timings.update(prepared["timings"])
+    timings["prepare"] = (time.perf_counter() - start) * 1000
 
-    async def stream_answer() -> AsyncGenerator[str, None]:
-        chat_state = await wait_for_chat_done()
-        pdf_id = chat_state["pdf_id"]
-        
-        docs = hybrid_search_for_pdf(
-            query=request.message,
-            pdf_id=pdf_id,
-            collection_name=get_collection_name("pdf_vectors_v2"),
-            k=100
-        )
-        
-        # Changed: print() -> logger.info()
-        logger.info(f"Retrieved {len(docs)} chunks for query: {request.message}")
-        for i, doc in enumerate(docs):
-            logger.debug(f"Chunk {i}: {doc.page_content[:200]}...")
+    # Changed: print() -> logger.info()
+    docs = prepared["docs"]
+    logger.info(f"Retrieved {len(docs)} chunks for query: {request.message}")
+    for i, doc in enumerate(docs):
+        logger.debug(f"Chunk {i}: {doc.page_content[:200]}...")
 
+    async def stream_answer() -> AsyncGenerator[str, None]:
+        metrics = get_metrics()
+        first_token = True
         async for chunk in qa_chain(
             user_query=request.message,
             retrieved_docs=docs,
+            pdf_id=pdf_id,
+            question=prepared["question"],
         ):
+            if first_token:
+                metrics.observe("chat.ttft_ms", (time.perf_counter() - start) * 1000)
+                first_token = False
             yield chunk
+        metrics.observe("chat.total_ms", (time.perf_counter() - start) * 1000)
 
+    for stage, ms in timings.items():
+        get_metrics().observe(f"chat.{stage}_ms", ms)
+    expansion = "expanded" if prepared["decision"]["expand"] else "skipped"
     return StreamingResponse(
         stream_answer(),
-        media_type="text/stream"
+        media_type="text/stream",
+        headers={
+            "Server-Timing": _server_timing(timings, expansion),
+            "Timing-Allow-Origin": "*",
+        }
     )
 
 
+def _server_timing(timings: dict, expansion: str) -> str:
+    """Server-Timing header value: one metric per stage, durations in ms."""
+    parts = [f"{stage};dur={ms:.1f}" for stage, ms in timings.items()]
+    parts.append(f'expansion;desc="{expansion}"')
+    return ", ".join(parts)
+
+
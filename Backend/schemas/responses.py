@@ -37,8 +37,11 @@ class SearchResponse(BaseModel):
     What this does:
     - Wraps list of papers in consistent format
     - Matches your current {"results": [...]} structure
+    - query_path: how /search_text answered ("cache", "semantic_cache",
+      "raw", "expanded" or "fused"); None for other endpoints
     """
     results: List[PaperResult]
+    query_path: Optional[str] = None
 
 
 class JobStatusResponse(BaseModel):
@@ -52,6 +55,8 @@ class JobStatusResponse(BaseModel):
     status: Literal["running", "done", "error", "not_found"]
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    progress: Optional[Dict[str, Any]] = None  # latest pipeline stage, e.g. {"stage": "summarized", "done": 3, "total": 12}
+    timings: Optional[Dict[str, Any]] = None  # per-stage seconds / throughput, e.g. {"embed": {"seconds": 1.2, "items": 40}}
 
 
 class JobInitResponse(BaseModel):
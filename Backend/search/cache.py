@@ -0,0 +1,170 @@
+"""
+Result cache for paper search.
+
+Two tiers in front of query expansion, embedding and the Qdrant query:
+1. Exact: keyed by the normalized query plus filters, with TTL and LRU eviction
+2. Near-duplicate (optional): the cached query whose raw-query embedding has the
+   highest cosine similarity, if it is above SEARCH_CACHE_SIMILARITY
+
+Entries are tagged with the papers collection version (its points count) and
+dropped when it changes, so re-indexing never serves stale results.
+"""
+import os
+import re
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from Backend.utils.cache import LRUCache
+from Backend.database.qdrant_client import get_async_qdrant_client, get_collection_name
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "600"))
+SEARCH_CACHE_MAX_ITEMS = int(os.getenv("SEARCH_CACHE_MAX_ITEMS", "1024"))
+# Near-duplicate tier: min cosine between raw-query embeddings (0 disables the tier)
+SEARCH_CACHE_SIMILARITY = float(os.getenv("SEARCH_CACHE_SIMILARITY", "0.97"))
+# How often the collection version is re-read (one cheap get_collection call)
+SEARCH_CACHE_VERSION_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_VERSION_TTL_SECONDS", "30"))
+
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace and trailing punctuation don't change what is searched for."""
+    query = re.sub(r"\s+", " ", (query or "").lower()).strip()
+    return query.rstrip(" ?!.")
+
+
+class SearchResultCache:
+    """
+    Args:
+        ttl_seconds: Entries older than this are misses
+        max_items: LRU bound on the number of cached queries
+        similarity: Near-duplicate threshold (0 disables the embedding tier)
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = SEARCH_CACHE_TTL_SECONDS,
+        max_items: int = SEARCH_CACHE_MAX_ITEMS,
+        similarity: float = SEARCH_CACHE_SIMILARITY,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.entries = LRUCache(max_items=max_items)
+        self.lookups = 0
+        self.hits = 0
+        self.semantic_hits = 0
+        self.invalidations = 0
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self._version_lock = asyncio.Lock()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.similarity > 0
+
+    @staticmethod
+    def key(query: str, **filters: Any) -> Tuple[Hashable, ...]:
+        return (normalize_query(query), tuple(sorted(filters.items())))
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        return entry["version"] == self._version and time.monotonic() - entry["stored_at"] < self.ttl_seconds
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[List[Dict[str, Any]]]:
+        entry = self.entries.get(key)
+        with self._stats_lock:
+            self.lookups += 1
+        if entry is None:
+            return None
+        if not self._fresh(entry):
+            self.entries.pop(key)
+            return None
+        with self._stats_lock:
+            self.hits += 1
+        return entry["results"]
+
+    def get_similar(self, key: Tuple[Hashable, ...], vector: List[float]) -> Optional[List[Dict[str, Any]]]:
+        """Results of the most similar cached query with the same filters, if similar enough."""
+        if not self.semantic_enabled:
+            return None
+        candidates = [
+            entry for _, entry in self.entries.items()
+            if entry["filters"] == key[1] and entry["vector"] is not None and self._fresh(entry)
+        ]
+        if not candidates:
+            return None
+
+        query = np.asarray(vector, dtype=np.float32)
+        matrix = np.stack([entry["vector"] for entry in candidates])
+        scores = matrix @ (query / (np.linalg.norm(query) or 1.0))
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity:
+            return None
+        with self._stats_lock:
+            self.semantic_hits += 1
+        return candidates[best]["results"]
+
+    def put(self, key: Tuple[Hashable, ...], results: List[Dict[str, Any]], vector: Optional[List[float]] = None) -> None:
+        if vector is not None:
+            vector = np.asarray(vector, dtype=np.float32)
+            vector = vector / (np.linalg.norm(vector) or 1.0)
+        self.entries.put(key, {
+            "results": results,
+            "filters": key[1],
+            "vector": vector,
+            "version": self._version,
+            "stored_at": time.monotonic(),
+        })
+
+    async def check_version(self) -> None:
+        """Re-read the papers collection version at most every SEARCH_CACHE_VERSION_TTL_SECONDS; clear on change."""
+        if time.monotonic() - self._version_checked_at < SEARCH_CACHE_VERSION_TTL_SECONDS:
+            return
+        async with self._version_lock:
+            if time.monotonic() - self._version_checked_at < SEARCH_CACHE_VERSION_TTL_SECONDS:
+                return
+            try:
+                info = await get_async_qdrant_client().get_collection(get_collection_name("papers_semantic_v1"))
+                version = info.points_count
+            except Exception as e:
+                # keep serving with the last known version; retried on the next check
+                logger.warning(f"⚠️ Could not read papers collection version: {e}")
+                self._version_checked_at = time.monotonic()
+                return
+            if version != self._version:
+                if self._version is not None:
+                    logger.info(f"🔄 Papers collection changed ({self._version} -> {version} points), clearing search cache")
+                    self.invalidations += 1
+                self.entries.clear()
+                self._version = version
+            self._version_checked_at = time.monotonic()
+
+    def stats(self) -> dict:
+        served = self.hits + self.semantic_hits
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.lookups - served,
+            "hit_rate": round(served / self.lookups, 4) if self.lookups else 0.0,
+            "collection_version": self._version,
+            "invalidations": self.invalidations,
+        }
+
+
+_search_cache: Optional[SearchResultCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchResultCache:
+    """Get or create the process-wide search result cache (singleton pattern)."""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchResultCache()
+        return _search_cache
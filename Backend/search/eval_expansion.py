@@ -0,0 +1,105 @@
+"""
+Offline recall@k evaluation of the query expansion modes.
+
+Known-item queries: for a sample of papers from data/metadata, the query is the
+first few content words of the title (short and vague, like what users type)
+and the relevant result is that paper. Each query is expanded with every mode,
+embedded and searched exactly like /search_text; a hit is the paper appearing
+in the top k.
+
+    python -m Backend.search.eval_expansion --modes none lexical llm --sample 200
+"""
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+from typing import Dict, List
+
+from Backend.database.qdrant_client import get_qdrant_client, get_collection_name
+from Backend.embedding.embedd import embed_string
+from Backend.ingestion.extraction import expand_query
+from Backend.search.lexical_expansion import corpus_files, tokenize
+from Backend.search.service import SearchService
+from Backend.utils.metrics import describe
+
+MODES = ("none", "lexical", "llm")
+
+
+def point_id(record: dict) -> str:
+    """Point id the ingestion gave this record (see embeddings/model/vector.py)."""
+    raw_id = record.get("id") or record.get("arxiv_id") or record.get("title")
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, str(raw_id).strip()))
+
+
+def known_item_queries(sample: int, query_words: int, seed: int) -> List[Dict[str, str]]:
+    records = []
+    for path in corpus_files():
+        with open(path, "r", encoding="utf-8") as f:
+            records.extend(r for r in json.load(f) if r.get("title"))
+    random.Random(seed).shuffle(records)
+
+    queries = []
+    for record in records:
+        words = [w for w in record["title"].split() if tokenize(w)][:query_words]
+        if len(words) >= 2:
+            queries.append({"query": " ".join(words), "target": point_id(record)})
+        if len(queries) >= sample:
+            break
+    return queries
+
+
+def indexed_targets(queries: List[Dict[str, str]]) -> set:
+    """Targets that exist in the collection (others can't be found by any mode)."""
+    ids = [q["target"] for q in queries]
+    points = get_qdrant_client().retrieve(get_collection_name("papers_semantic_v1"), ids=ids, with_payload=False)
+    return {str(p.id) for p in points}
+
+
+def evaluate(queries: List[Dict[str, str]], modes: List[str], k: int) -> List[Dict]:
+    service = SearchService()
+    results = []
+    for mode in modes:
+        hits, expand_ms = 0, []
+        for q in queries:
+            start = time.perf_counter()
+            expanded = expand_query(q["query"], mode) or q["query"]
+            expand_ms.append((time.perf_counter() - start) * 1000)
+            embeddings = embed_string(expanded)
+            found = service.search(embeddings["dense_embedding"], embeddings["sparse_embedding"], limit=k)
+            hits += any(str(r["id"]) == q["target"] for r in found)
+        results.append({
+            "mode": mode,
+            f"recall@{k}": round(hits / len(queries), 4),
+            "expand_ms": describe(expand_ms),
+        })
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--query-words", type=int, default=4, help="title words kept as the query")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args(argv)
+
+    queries = known_item_queries(args.sample, args.query_words, args.seed)
+    indexed = indexed_targets(queries)
+    skipped = len(queries) - sum(q["target"] in indexed for q in queries)
+    queries = [q for q in queries if q["target"] in indexed]
+    if not queries:
+        print("❌ None of the sampled papers are in the collection")
+        return 1
+
+    print(f"{len(queries)} known-item queries ({skipped} sampled papers not indexed, skipped)")
+    for r in evaluate(queries, args.modes, args.k):
+        e = r["expand_ms"]
+        print(f"{r['mode']:<8} recall@{args.k}={r[f'recall@{args.k}']:<7} expansion p50={e['p50']}ms p95={e['p95']}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
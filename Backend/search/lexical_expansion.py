@@ -0,0 +1,232 @@
+"""
+Local lexical query expansion: no network, microseconds per query.
+
+A thesaurus is built once from the titles and abstracts under data/metadata:
+1. Related terms: normalized PMI of document-level co-occurrence, keeping
+   the strongest neighbours of every term
+2. Acronyms: "long form (ACR)" definitions found in the corpus, in both directions
+
+The thesaurus is saved next to this module and rebuilt when the corpus changes.
+Selected with QUERY_EXPANSION_MODE=lexical (see Backend.ingestion.extraction).
+"""
+import os
+import re
+import glob
+import json
+import time
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+METADATA_DIR = os.getenv("METADATA_DIR", os.path.join(BASE_DIR, "..", "..", "data", "metadata"))
+LEXICAL_THESAURUS_PATH = os.getenv("LEXICAL_THESAURUS_PATH", os.path.join(BASE_DIR, "lexical_thesaurus.json"))
+
+MIN_DF = 5                # terms in fewer documents have no reliable neighbours
+MAX_DF_RATIO = 0.05       # terms in more documents are too generic to expand
+MIN_COOCCURRENCE = 5
+MIN_NPMI = 0.25
+NEIGHBOURS_PER_TERM = 5
+EXPANSION_TERMS_PER_QUERY_TERM = 3
+MAX_EXPANSION_TERMS = 12
+
+_TOKEN = re.compile(r"[a-z][a-z0-9\-]+")
+_ACRONYM = re.compile(r"\(([A-Z][A-Za-z]{1,7})\)")
+_STOPWORDS = frozenset("""
+a about above after again against all also although among an and any are as at be because been before being
+below between both but by can could did do does doing down during each either et few for from further had has
+have having he her here hers him his how however i if in into is it its itself just less may might more most
+much must my no nor not of off on once only or other our ours out over own per same she should since so some
+such than that the their them then there these they this those through thus to too under until up upon us very
+via was we were what when where whether which while who whom why will with within without would yet you your
+paper study results result show shows shown using used use based new approach method methods propose proposed
+present presented two three one first second however found also well can here different several number
+""".split())
+
+
+def _singular(term: str) -> str:
+    # plural folding only ("networks" -> "network"), so neighbours aren't just inflections
+    return term[:-1] if len(term) > 4 and term.endswith("s") and not term.endswith(("ss", "us", "is")) else term
+
+
+def tokenize(text: str) -> List[str]:
+    return [_singular(t.strip("-")) for t in _TOKEN.findall((text or "").lower()) if t not in _STOPWORDS and len(t) > 2]
+
+
+def _matches_initials(words: List[str], acronym: str) -> Optional[str]:
+    """Long form for acronym: the shortest run of trailing words whose initials spell it."""
+    letters = acronym.rstrip("s").lower()
+    for n in range(len(letters), min(len(words), len(letters) + 2) + 1):
+        candidate = words[-n:]
+        initials = "".join(w[0] for w in candidate if w.lower() not in _STOPWORDS)
+        if initials.lower() == letters:
+            return " ".join(w.lower() for w in candidate)
+    return None
+
+
+def corpus_files() -> List[str]:
+    return sorted(glob.glob(os.path.join(METADATA_DIR, "*", "*.json")))
+
+
+def _corpus_fingerprint(files: List[str]) -> str:
+    stats = [os.stat(f) for f in files]
+    return f"{len(files)}:{sum(s.st_size for s in stats)}:{max((s.st_mtime for s in stats), default=0):.0f}"
+
+
+def build_thesaurus(files: Optional[List[str]] = None) -> dict:
+    """{"related": {term: [[neighbour, npmi], ...]}, "acronyms": {acr: long form}, "long_forms": {long form: acr}}"""
+    files = files if files is not None else corpus_files()
+    docs: List[set] = []
+    acronym_votes: Dict[str, Counter] = defaultdict(Counter)
+
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        for record in records:
+            text = f"{record.get('title') or ''}. {record.get('abstract') or ''}"
+            docs.append(set(tokenize(text)))
+            for match in _ACRONYM.finditer(text):
+                # the long form, if any, is in the words right before "(ACR)"
+                words = re.findall(r"[A-Za-z][\w\-]*", text[max(0, match.start() - 120):match.start()])
+                long_form = _matches_initials(words, match.group(1))
+                if long_form:
+                    acronym_votes[match.group(1).rstrip("s").lower()][long_form] += 1
+
+    n_docs = len(docs)
+    df = Counter(term for doc in docs for term in doc)
+    max_df = max(MIN_DF, int(MAX_DF_RATIO * n_docs))
+    vocabulary = {t for t, c in df.items() if MIN_DF <= c <= max_df}
+
+    # every co-occurring pair as one integer (a * V + b), counted with numpy
+    terms = sorted(vocabulary)
+    term_ids = {t: i for i, t in enumerate(terms)}
+    size = len(terms)
+    chunks = []
+    for doc in docs:
+        ids = np.fromiter(sorted(term_ids[t] for t in doc if t in term_ids), dtype=np.int64)
+        a, b = np.triu_indices(len(ids), k=1)
+        chunks.append(ids[a] * size + ids[b])
+    pairs, counts = np.unique(np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64), return_counts=True)
+    keep = counts >= MIN_COOCCURRENCE
+    pairs, counts = pairs[keep], counts[keep]
+
+    a_ids, b_ids = pairs // size, pairs % size
+    doc_freq = np.array([df[t] for t in terms], dtype=np.float64)
+    p_ab = counts / n_docs
+    npmi = np.log(p_ab / ((doc_freq[a_ids] / n_docs) * (doc_freq[b_ids] / n_docs))) / -np.log(p_ab)
+
+    neighbours: Dict[str, List[List]] = defaultdict(list)
+    for i in np.nonzero(npmi >= MIN_NPMI)[0]:
+        a, b, score = terms[a_ids[i]], terms[b_ids[i]], round(float(npmi[i]), 4)
+        neighbours[a].append([b, score])
+        neighbours[b].append([a, score])
+
+    related = {
+        term: sorted(candidates, key=lambda c: c[1], reverse=True)[:NEIGHBOURS_PER_TERM]
+        for term, candidates in neighbours.items()
+    }
+    # two-letter acronyms are ambiguous ("NN", "GA"): keep them only when defined repeatedly
+    acronyms = {
+        acr: votes.most_common(1)[0][0]
+        for acr, votes in acronym_votes.items()
+        if len(acr) >= 3 or votes.most_common(1)[0][1] >= 3
+    }
+    return {
+        "documents": n_docs,
+        "related": related,
+        "acronyms": acronyms,
+        "long_forms": {long_form: acr for acr, long_form in acronyms.items()},
+    }
+
+
+class LexicalExpander:
+    def __init__(self, thesaurus: dict):
+        self.related = thesaurus["related"]
+        self.acronyms = thesaurus["acronyms"]
+        self.long_forms = thesaurus["long_forms"]
+
+    def expansion_terms(self, query: str) -> List[str]:
+        """Terms to add to query, strongest first."""
+        lowered = " ".join(query.lower().split())
+        query_terms = tokenize(query)
+        seen = set(query_terms)
+        added: List[str] = []
+
+        def add(term: str):
+            if term not in seen and len(added) < MAX_EXPANSION_TERMS:
+                seen.add(term)
+                seen.update(tokenize(term))  # words of an added long form aren't re-added alone
+                added.append(term)
+
+        for word in re.findall(r"[A-Za-z][A-Za-z]+", query):
+            # only written-as-acronym tokens ("CNN", "CNNs"): "art" or "map" are ordinary words
+            acronym = word[:-1] if word.endswith("s") else word
+            long_form = self.acronyms.get(acronym.lower()) if acronym.isupper() else None
+            if long_form:
+                add(long_form)
+        for long_form, acronym in self.long_forms.items():
+            if long_form in lowered:
+                add(acronym.upper())
+
+        for term in query_terms:
+            for neighbour, _ in self.related.get(term, [])[:EXPANSION_TERMS_PER_QUERY_TERM]:
+                add(neighbour)
+        return added
+
+    def expand(self, query: str) -> str:
+        terms = self.expansion_terms(query)
+        return f"{query.strip()} {' '.join(terms)}".strip()
+
+
+_expander: Optional[LexicalExpander] = None
+_expander_lock = threading.Lock()
+
+
+def get_lexical_expander() -> LexicalExpander:
+    """Load (or build and save) the thesaurus on first use (singleton pattern)."""
+    global _expander
+    with _expander_lock:
+        if _expander is not None:
+            return _expander
+
+        files = corpus_files()
+        fingerprint = _corpus_fingerprint(files)
+        thesaurus = None
+        try:
+            with open(LEXICAL_THESAURUS_PATH, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("fingerprint") == fingerprint:
+                thesaurus = saved
+        except (OSError, ValueError):
+            pass
+
+        if thesaurus is None:
+            start = time.perf_counter()
+            thesaurus = build_thesaurus(files)
+            thesaurus["fingerprint"] = fingerprint
+            logger.info(
+                f"✅ Lexical thesaurus built from {thesaurus['documents']} documents in "
+                f"{time.perf_counter() - start:.1f}s ({len(thesaurus['related'])} terms, {len(thesaurus['acronyms'])} acronyms)"
+            )
+            try:
+                tmp_path = f"{LEXICAL_THESAURUS_PATH}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(thesaurus, f)
+                os.replace(tmp_path, LEXICAL_THESAURUS_PATH)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not save lexical thesaurus: {e}")
+
+        _expander = LexicalExpander(thesaurus)
+        return _expander
+
+
+def lexical_query_expand(text: str) -> str:
+    """Query plus related terms and acronym expansions from the local thesaurus."""
+    if not text or not text.strip():
+        return ""
+    return get_lexical_expander().expand(text)
@@ -5,11 +5,45 @@ import requests  # Fixed import - requests is not from fastapi
 from io import BytesIO
 from typing import List, Dict, Any, Optional
 from qdrant_client.http import models
-from Backend.database.qdrant_client import get_qdrant_client, get_collection_name
+from Backend.database.qdrant_client import get_qdrant_client, get_async_qdrant_client, get_collection_name
 
 FIELDS = ["biology", "chemistry", "computer_science", "engineering", "mathematics", "physics"]
 PAGE_CACHE = {}
 
+# Payload fields consumed by format_result / get_metadata_by_id.
+# Everything else stored on a paper point (e.g. the full "text") stays on the server.
+RESULT_PAYLOAD_FIELDS = [
+    "title",
+    "authors",
+    "abstract",
+    "download_url",
+    "num_pages",
+    "publication_date",
+    "citation_count",
+    "source_repository",
+    "document_type",
+    "field_of_study",
+    "arxiv_id",
+]
+
+RRF_K = 60  # standard reciprocal rank fusion constant
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]], limit: int, k: int = RRF_K) -> List[Dict[str, Any]]:
+    """
+    Fuse formatted result lists by reciprocal rank (sum of 1 / (k + rank) per list).
+    Results are matched by id; "score" becomes the fused score.
+    """
+    scores: Dict[Any, float] = {}
+    items: Dict[Any, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, item in enumerate(results, start=1):
+            scores[item["id"]] = scores.get(item["id"], 0.0) + 1.0 / (k + rank)
+            items.setdefault(item["id"], item)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [{**items[i], "score": round(scores[i], 6)} for i in ranked]
+
+
 class SearchService:
     def __init__(
         self,
@@ -21,8 +55,17 @@ class SearchService:
         Args:
             collection_name: Optional collection name (defaults to papers collection from env)
         """
-        self.client = get_qdrant_client()
         self.collection_name = collection_name or get_collection_name("papers_semantic_v1")
+
+    @property
+    def client(self):
+        # resolved on use, so creating a SearchService at import time stays cheap
+        return get_qdrant_client()
+
+    @property
+    def async_client(self):
+        # created on first use: worker processes only ever use the sync client
+        return get_async_qdrant_client()
         
     
 
@@ -55,14 +98,15 @@ class SearchService:
         "arxiv_id": item.payload.get("arxiv_id"),
         "score": item.score,
     }
-    def search(
+    def _build_query(
         self,
         dense_embedding: List[float],
         sparse_embedding: Dict[str, List[float]],
         limit: int,
         author_filter: Optional[str] = None,
         field_filter: Optional[str] = None,
-    ) -> List[Dict[str, Any]]:
+    ) -> Dict[str, Any]:
+        """query_points keyword arguments shared by search() and asearch()."""
     
         must_conditions = []
     
@@ -113,21 +157,61 @@ class SearchService:
             limit=limit,
         )
     
-        results = self.client.query_points(
+        return dict(
             collection_name=self.collection_name,
             prefetch=[dense_prefetch, sparse_prefetch],
             query=models.FusionQuery(
                 fusion=models.Fusion.RRF
             ),
             limit=limit,
-            with_payload=True,
+            with_payload=RESULT_PAYLOAD_FIELDS,
             query_filter=page_limit_filter,
         )
         # filter_point_num_pages=[] # using this here will reduce the redundancy ovre format result to call the api arXiv for page count as in this already have all query point just we need to filter them here
-        
-    
+
+    def search(
+        self,
+        dense_embedding: List[float],
+        sparse_embedding: Dict[str, List[float]],
+        limit: int,
+        author_filter: Optional[str] = None,
+        field_filter: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        results = self.client.query_points(
+            **self._build_query(dense_embedding, sparse_embedding, limit, author_filter, field_filter)
+        )
+        return [self.format_result(point) for point in results.points]
+
+    async def asearch(
+        self,
+        dense_embedding: List[float],
+        sparse_embedding: Dict[str, List[float]],
+        limit: int,
+        author_filter: Optional[str] = None,
+        field_filter: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Same as search(), without blocking the event loop (for request handlers)."""
+        results = await self.async_client.query_points(
+            **self._build_query(dense_embedding, sparse_embedding, limit, author_filter, field_filter)
+        )
         return [self.format_result(point) for point in results.points]
     
+    @staticmethod
+    def _format_metadata(item: Any) -> Dict[str, Any]:
+        return {
+            "title": item.payload.get("title"),
+            "authors": item.payload.get("authors"),
+            "abstract": item.payload.get("abstract"),
+            "download_url": item.payload.get("download_url"),
+            "num_pages":item.payload.get("num_pages"),
+            "publication_date": item.payload.get("publication_date"),
+            "citation_count": item.payload.get("citation_count"),
+            "source_repository": item.payload.get("source_repository"),
+            "document_type": item.payload.get("document_type"),
+            "field_of_study": item.payload.get("field_of_study"),
+            "arxiv_id": item.payload.get("arxiv_id")
+        }
+
     def get_metadata_by_id(
         self,
         point_id: str, 
@@ -136,24 +220,10 @@ class SearchService:
         result = self.client.retrieve(
              ids=[point_id],
              collection_name=self.collection_name,
-             with_payload=True,
+             with_payload=RESULT_PAYLOAD_FIELDS,
              with_vectors=False
          )
         #result is list 
         if result and len(result)>0:
-            item = result[0]
-
-            return {
-                "title": item.payload.get("title"),
-                "authors": item.payload.get("authors"),
-                "abstract": item.payload.get("abstract"),
-                "download_url": item.payload.get("download_url"),
-                "num_pages":item.payload.get("num_pages"),
-                "publication_date": item.payload.get("publication_date"),
-                "citation_count": item.payload.get("citation_count"),
-                "source_repository": item.payload.get("source_repository"),
-                "document_type": item.payload.get("document_type"),
-                "field_of_study": item.payload.get("field_of_study"),
-                "arxiv_id": item.payload.get("arxiv_id")
-            }
-        return None
\ No newline at end of file
+            return self._format_metadata(result[0])
+        return None
@@ -0,0 +1,158 @@
+"""
+In-process metrics: named observations with count / sum / max and
+percentiles over a bounded window of recent values. Series observed with
+bucket boundaries also count every value into its bucket (histogram; "le_8"
+holds values above the previous bound and up to 8).
+
+Also aggregates the per-stage timings that workers store on job records,
+so the API can report pipeline latency for jobs that ran in another process.
+"""
+import math
+import bisect
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+WINDOW_SIZE = 1024  # recent values kept per metric for percentiles
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0..100) of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def describe(values: Iterable[float]) -> dict:
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "max": round(values[-1], 4),
+    }
+
+
+class _Series:
+    __slots__ = ("count", "total", "max", "window", "buckets", "bucket_counts")
+
+    def __init__(self, buckets: Optional[Tuple[float, ...]] = None):
+        self.count = 0
+        self.total = 0.0
+        self.max = float("-inf")
+        self.window = deque(maxlen=WINDOW_SIZE)
+        self.buckets = buckets
+        # one count per upper bound, plus the overflow (+Inf) bucket
+        self.bucket_counts = [0] * (len(buckets) + 1) if buckets else None
+
+
+class MetricsRegistry:
+    """Thread-safe registry of named observations (timings, sizes, counts)."""
+
+    def __init__(self):
+        self._series: Dict[str, _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, buckets: Optional[Sequence[float]] = None) -> None:
+        """
+        Record a value. buckets (ascending upper bounds) turn the series into a
+        histogram; they are fixed by the first observation of the series.
+        """
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = _Series(tuple(buckets) if buckets else None)
+            series.count += 1
+            series.total += value
+            series.max = max(series.max, value)
+            series.window.append(value)
+            if series.buckets:
+                series.bucket_counts[bisect.bisect_left(series.buckets, value)] += 1
+
+    def mean(self, name: str) -> Optional[float]:
+        """Mean of the recent window of a series (None if never observed)."""
+        with self._lock:
+            series = self._series.get(name)
+            window = list(series.window) if series else []
+        return sum(window) / len(window) if window else None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            items = [
+                (name, s.count, s.total, s.max, list(s.window), s.buckets, list(s.bucket_counts or []))
+                for name, s in self._series.items()
+            ]
+        result = {}
+        for name, count, total, max_value, window, buckets, bucket_counts in sorted(items):
+            stats = describe(window)
+            stats.update({"count": count, "sum": round(total, 4), "max": round(max_value, 4)})
+            if buckets:
+                labels = [f"le_{b:g}" for b in buckets] + ["le_inf"]
+                stats["histogram"] = dict(zip(labels, bucket_counts))
+            result[name] = stats
+        return result
+
+
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get or create the process-wide metrics registry (singleton pattern)."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = MetricsRegistry()
+        return _metrics
+
+
+def summarize_job_timings(records: List[dict], slowest: int = 5) -> dict:
+    """
+    Aggregate {"job_id", "kind", "timings"} records (see JobStore.recent_timings).
+
+    Returns, per job kind:
+        stages:  seconds per stage (count / mean / p50 / p95 / max) and mean throughput
+        slowest: the slowest jobs with the stage that dominated each one
+    """
+    by_kind: Dict[str, List[dict]] = {}
+    for record in records:
+        by_kind.setdefault(record["kind"], []).append(record)
+
+    summary = {}
+    for kind, jobs in by_kind.items():
+        seconds: Dict[str, List[float]] = {}
+        rates: Dict[str, List[float]] = {}
+        for job in jobs:
+            for stage, timing in job["timings"].items():
+                seconds.setdefault(stage, []).append(timing.get("seconds", 0.0))
+                if "items_per_s" in timing:
+                    rates.setdefault(stage, []).append(timing["items_per_s"])
+
+        stages = {}
+        for stage, values in seconds.items():
+            stages[stage] = describe(values)
+            if stage in rates:
+                stages[stage]["mean_items_per_s"] = round(sum(rates[stage]) / len(rates[stage]), 2)
+
+        def dominant(timings: dict) -> Optional[str]:
+            work = {s: t.get("seconds", 0.0) for s, t in timings.items() if s not in ("total", "queue")}
+            return max(work, key=work.get) if work else None
+
+        ranked = sorted(jobs, key=lambda j: j["timings"].get("total", {}).get("seconds", 0.0), reverse=True)
+        summary[kind] = {
+            "jobs": len(jobs),
+            "stages": stages,
+            "slowest": [
+                {
+                    "job_id": j["job_id"],
+                    "total_seconds": j["timings"].get("total", {}).get("seconds"),
+                    "dominant_stage": dominant(j["timings"]),
+                }
+                for j in ranked[:slowest]
+            ],
+        }
+    return summary
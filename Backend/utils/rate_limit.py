@@ -0,0 +1,154 @@
+"""
+Provider rate limiting and retry helpers.
+Shared by every pipeline stage that talks to a remote model provider.
+"""
+import time
+import random
+import logging
+import threading
+from typing import Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting requests (RPM) and optionally LLM tokens (TPM).
+
+    Buckets start full so a short burst goes out immediately, then refill
+    continuously. On a 429 the limiter pauses every caller and halves its
+    effective rate; each success recovers a little of it (AIMD), so the
+    provider is kept close to its real ceiling.
+    """
+
+    MIN_FACTOR = 0.1
+
+    def __init__(self, rpm: int, tpm: Optional[int] = None, burst: Optional[int] = None):
+        if rpm <= 0:
+            raise ValueError("rpm must be positive")
+        self.rpm = rpm
+        self.tpm = tpm
+        self.capacity = float(burst or rpm)
+        self._requests = self.capacity
+        self._tokens = float(tpm or 0)
+        self._factor = 1.0
+        self._blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.capacity, self._requests + elapsed * self.rpm / 60.0 * self._factor)
+        if self.tpm:
+            self._tokens = min(float(self.tpm), self._tokens + elapsed * self.tpm / 60.0 * self._factor)
+
+    def acquire(self, tokens: int = 0) -> None:
+        """
+        Block until one request slot (and `tokens` LLM tokens, if TPM is set) is available.
+        Requests larger than the whole TPM budget are clamped so they can still go out.
+        """
+        if self.tpm:
+            tokens = min(tokens, self.tpm)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                else:
+                    self._refill()
+                    need_tokens = self.tpm and self._tokens < tokens
+                    if self._requests >= 1 and not need_tokens:
+                        self._requests -= 1
+                        if self.tpm:
+                            self._tokens -= tokens
+                        return
+                    wait = (1 - self._requests) * 60.0 / (self.rpm * self._factor) if self._requests < 1 else 0.0
+                    if need_tokens:
+                        wait = max(wait, (tokens - self._tokens) * 60.0 / (self.tpm * self._factor))
+            time.sleep(max(wait, 0.01))
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """
+        Record a 429: pause all callers and halve the effective rate.
+        Returns the pause in seconds.
+        """
+        with self._lock:
+            self._factor = max(self.MIN_FACTOR, self._factor / 2)
+            pause = retry_after if retry_after is not None else 60.0 / (self.rpm * self._factor)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+            self._requests = min(self._requests, 0.0)
+        logger.warning(f"⚠️ Rate limited, pausing {pause:.1f}s (rate factor {self._factor:.2f})")
+        return pause
+
+    def on_success(self) -> None:
+        """Slowly recover the effective rate after a successful call."""
+        with self._lock:
+            self._factor = min(1.0, self._factor + 0.05)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, rpm: int, tpm: Optional[int] = None) -> RateLimiter:
+    """
+    Get or create the shared limiter for a provider (singleton per name).
+    The limits of the first caller win.
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = RateLimiter(rpm=rpm, tpm=tpm)
+        return _limiters[provider]
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    """Best-effort detection of HTTP 429 across Groq / LangChain / HF clients."""
+    status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    message = str(e).lower()
+    return "429" in message or "rate limit" in message or "rate_limit" in message
+
+
+def retry_after_seconds(e: Exception) -> Optional[float]:
+    """Read the Retry-After header from a provider error, if present."""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_with_backoff(
+    fn: Callable[[], T],
+    retries: int = 3,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    limiter: Optional[RateLimiter] = None,
+) -> T:
+    """
+    Call fn, retrying on any exception with exponential backoff and jitter.
+    429s are reported to the limiter (if given), which pauses every caller
+    sharing it instead of only this one.
+    Re-raises the last exception once retries are exhausted.
+    """
+    for attempt in range(retries + 1):
+        try:
+            result = fn()
+            if limiter:
+                limiter.on_success()
+            return result
+        except Exception as e:
+            if attempt >= retries:
+                raise
+            if limiter and is_rate_limit_error(e):
+                limiter.on_rate_limited(retry_after_seconds(e))
+                continue
+            delay = min(max_delay, base_delay * (2 ** attempt)) * (0.5 + random.random() / 2)
+            logger.warning(f"⚠️ Attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
@@ -0,0 +1 @@
+# Background job workers (notes / chat preparation)
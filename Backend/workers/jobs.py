@@ -0,0 +1,90 @@
+"""
+Job handlers run by the worker (moved out of the API routes).
+Each handler takes (job_id, payload) and writes its result to the job store.
+Results are merged into the job state so the progress / timings recorded
+while the job ran stay on the record.
+"""
+from Backend.search.service import SearchService
+from Backend.notes.text.summarizer import generate_notes_from_pdf
+from Backend.chat.start_chat_pipeline import prepare_chat
+from Backend.database.job_store import get_job_store
+
+search_service = SearchService()
+
+
+def run_notes_job(job_id: str, payload: dict):
+    """Generate short notes for a selected paper by its vector index."""
+    job_store = get_job_store()
+    vector_index = payload["vector_index"]
+    try:
+        #getting metadata and full text pdf from vector index
+        metadata=search_service.get_metadata_by_id(vector_index)
+        if not metadata:
+            job_store.update_state(job_id, {"status": "error", "error": "Paper not found"})
+            return
+        
+        # Get PDF URL
+        pdf_url = metadata.get('download_url', '')
+        if not pdf_url:
+            job_store.update_state(job_id, {"status": "error", "error": "No PDF URL available"})
+            return
+            
+        # result is now { "notes": ..., "visuals": ... }
+        output = generate_notes_from_pdf(pdf_url=pdf_url)
+        
+        job_store.update_state(job_id, {
+            "status": "done",
+            "result": {
+                "extracted_text": output["notes"],
+                "visuals": output["visuals"],
+                "papermetadata": metadata
+            }
+        })
+    except Exception as e:
+        job_store.update_state(job_id, {"status": "error", "error": str(e)})
+    finally:
+        job_store.release("notes", vector_index)  # ✅ important
+
+
+def prepare_chat_pipeline(chat_session_id: str, payload: dict):
+    """Embed a paper into the chat collection so questions can be answered."""
+    job_store = get_job_store()
+    vector_index = payload["vector_index"]
+    try:
+        metadata = search_service.get_metadata_by_id(vector_index)
+        if not metadata:
+            job_store.update_state(chat_session_id, {
+                "status": "error",
+                "error": "Paper not found"
+            })
+            return
+
+        pdf_url = metadata.get("download_url")
+        if not pdf_url:
+            job_store.update_state(chat_session_id, {
+                "status": "error",
+                "error": "No PDF URL available"
+            })
+            return
+
+        result = prepare_chat(pdf_url=pdf_url)
+
+        job_store.update_state(chat_session_id, {
+            "status": "done",
+            "pdf_id": result["pdf_id"],   # ✅ store here
+        })
+
+    except Exception as e:
+        job_store.update_state(chat_session_id, {
+            "status": "error",
+            "error": str(e)
+        })
+
+    finally:
+        job_store.release("chat", vector_index)
+
+
+JOB_HANDLERS = {
+    "notes": run_notes_job,
+    "chat": prepare_chat_pipeline,
+}
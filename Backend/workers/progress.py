@@ -0,0 +1,128 @@
+"""
+Stage-level progress and timings for the job a worker thread is running.
+
+The runner binds the current job id to its thread; pipeline code calls
+report_progress(...) / timed(...) without knowing which job (if any) it
+belongs to. Outside a worker (scripts, tests) timings still reach the
+process metrics registry, but nothing is written to a job record.
+
+Job record fields:
+    progress: latest stage, e.g. {"stage": "summarized", "done": 3, "total": 12}
+    timings:  {stage: {"seconds", "items", "items_per_s", ...}} for every finished stage
+"""
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from Backend.database.job_store import get_job_store
+from Backend.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+_current = threading.local()
+
+
+@contextmanager
+def bind_job(job_id: str):
+    """Attribute progress and timings recorded on this thread to job_id."""
+    previous = (getattr(_current, "job_id", None), getattr(_current, "timings", None))
+    _current.job_id = job_id
+    _current.timings = {}
+    try:
+        yield
+    finally:
+        _current.job_id, _current.timings = previous
+
+
+def current_job_id() -> Optional[str]:
+    return getattr(_current, "job_id", None)
+
+
+def _update_job(fields: dict):
+    job_id = current_job_id()
+    if job_id is None:
+        return
+    try:
+        get_job_store().update_state(job_id, fields)
+    except Exception as e:
+        # progress is best effort; never fail the job over it
+        logger.warning(f"⚠️ Failed to update job {job_id}: {e}")
+
+
+def report_progress(stage: str, done: Optional[int] = None, total: Optional[int] = None, **details):
+    """
+    Record the current pipeline stage on the job, e.g.
+        report_progress("summarized", done=3, total=12)
+    Stages: downloaded, parsed, captioned, summarized, embedded, stored, retrieved, extracting, writing_notes
+    """
+    if current_job_id() is None:
+        return
+
+    progress = {"stage": stage, "updated_at": time.time()}
+    if done is not None:
+        progress["done"] = done
+    if total is not None:
+        progress["total"] = total
+    progress.update(details)
+    _update_job({"progress": progress})
+
+
+def record_timing(stage: str, seconds: float, items: Optional[int] = None, **details):
+    """
+    Record how long a stage took (and optionally how many items it processed).
+    Goes to the process metrics registry and to the current job's "timings".
+    """
+    timing = {"seconds": round(seconds, 3)}
+    if items is not None:
+        timing["items"] = items
+        if seconds > 0:
+            timing["items_per_s"] = round(items / seconds, 2)
+    timing.update(details)
+
+    metrics = get_metrics()
+    metrics.observe(f"stage.{stage}.seconds", seconds)
+    if "items_per_s" in timing:
+        metrics.observe(f"stage.{stage}.items_per_s", timing["items_per_s"])
+
+    timings = getattr(_current, "timings", None)
+    if timings is not None and current_job_id() is not None:
+        timings[stage] = timing
+        _update_job({"timings": dict(timings)})
+
+
+def record_wait(stage: str, seconds: float):
+    """Time spent waiting for a stage slot (see Backend/workers/stages.py); summed per job."""
+    get_metrics().observe(f"wait.{stage}.seconds", seconds)
+
+    timings = getattr(_current, "timings", None)
+    if timings is None or current_job_id() is None:
+        return
+    entry = timings.setdefault(f"wait_{stage}", {"seconds": 0.0})
+    entry["seconds"] = round(entry["seconds"] + seconds, 3)
+    # short waits are flushed with the next stage timing instead of a write of their own
+    if seconds >= 0.05:
+        _update_job({"timings": dict(timings)})
+
+
+@contextmanager
+def timed(stage: str, **details):
+    """
+    Time a block as a pipeline stage. The block may add counters to the yielded dict:
+
+        with timed("embed") as t:
+            ...
+            t["items"] = len(docs)
+
+    A block that raises is still recorded, with error=True.
+    """
+    stats = dict(details)
+    start = time.perf_counter()
+    try:
+        yield stats
+    except BaseException:
+        stats["error"] = True
+        raise
+    finally:
+        record_timing(stage, time.perf_counter() - start, **stats)
@@ -0,0 +1,256 @@
+"""
+Standalone job worker.
+
+Consumes the queue in the job store, so PDF parsing, model inference and
+LLM calls never run on the API's threadpool.
+
+Run next to the API with:
+    JOB_EXECUTOR=external  (on the API)
+    python -m Backend.workers.runner
+
+or leave JOB_EXECUTOR=embedded (default) and the API spawns the worker process.
+With several API processes (uvicorn --workers / gunicorn) only the one holding
+the file lock at WORKER_LOCK_PATH spawns it, so the box still runs a single
+worker: one model set in memory, and the per-stage limits in
+Backend/workers/stages.py hold box-wide. If that API process exits, its worker
+stops with it until that process is restarted; deployments that scale the API
+should run the worker externally.
+
+Lanes: each lane is a group of threads that only claims certain job kinds.
+The interactive lane only takes chat jobs (a user is waiting to type), so a
+backlog of notes jobs can never block chat preparation.
+"""
+import os
+import time
+import signal
+import logging
+import threading
+import multiprocessing
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from Backend.database.job_store import get_job_store, JOB_STORE_BACKEND, JOB_STORE_PATH, CLAIM_LEASE_SECONDS
+from Backend.workers.progress import bind_job, record_timing
+
+logger = logging.getLogger(__name__)
+
+JOB_EXECUTOR = os.getenv("JOB_EXECUTOR", "embedded")  # embedded | external
+# "<lane>:<threads>" pairs
+WORKER_LANES = os.getenv("WORKER_LANES", "interactive:1,default:2")
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "0.5"))
+# On shutdown, running jobs get this long to finish before they are handed back to the queue
+WORKER_DRAIN_SECONDS = float(os.getenv("WORKER_DRAIN_SECONDS", "30"))
+# Held by the API process that owns the embedded worker (one per job store)
+WORKER_LOCK_PATH = os.getenv("WORKER_LOCK_PATH", f"{JOB_STORE_PATH}.worker.lock")
+
+# Job kinds each lane may claim (None = any kind, highest priority first)
+LANE_KINDS: Dict[str, Optional[List[str]]] = {
+    "interactive": ["chat"],
+    "default": None,
+}
+
+# Jobs this process is running; their claim leases are renewed by the heartbeat
+_running: Set[str] = set()
+_running_lock = threading.Lock()
+
+
+def parse_lanes(spec: str = WORKER_LANES) -> List[Tuple[str, int]]:
+    lanes = []
+    for part in spec.split(","):
+        name, _, count = part.strip().partition(":")
+        if name not in LANE_KINDS:
+            raise ValueError(f"Unknown worker lane: {name}")
+        lanes.append((name, int(count or 1)))
+    return lanes
+
+
+def _heartbeat_loop():
+    """Renew the claim lease of every running job, so only a dead worker's jobs are re-issued."""
+    store = get_job_store()
+    while True:
+        time.sleep(CLAIM_LEASE_SECONDS / 3)
+        with _running_lock:
+            job_ids = list(_running)
+        try:
+            store.renew_claims(job_ids)
+        except Exception:
+            logger.exception("Failed to renew job claims")
+
+
+def _lane_loop(lane: str, stop_event: threading.Event):
+    from Backend.workers.jobs import JOB_HANDLERS
+
+    store = get_job_store()
+    kinds = LANE_KINDS[lane]
+    while not stop_event.is_set():
+        try:
+            job = store.claim_next(kinds)
+        except Exception:
+            logger.exception(f"[{lane}] Failed to claim job")
+            job = None
+        if job is None:
+            stop_event.wait(WORKER_POLL_INTERVAL)
+            continue
+
+        with _running_lock:
+            _running.add(job["job_id"])
+        handler = JOB_HANDLERS.get(job["kind"])
+        start = time.perf_counter()
+        logger.info(f"[{lane}] ▶ {job['kind']} job {job['job_id']}")
+        try:
+            if handler is None:
+                store.set_state(job["job_id"], {"status": "error", "error": f"Unknown job kind: {job['kind']}"})
+            else:
+                with bind_job(job["job_id"]):
+                    # time between the API queueing the job and a lane picking it up
+                    record_timing("queue", max(0.0, time.time() - job["enqueued_at"]))
+                    handler(job["job_id"], job["payload"])
+                    record_timing("total", time.perf_counter() - start)
+        except Exception:
+            # handlers record their own errors; this only guards the loop
+            logger.exception(f"[{lane}] Job {job['job_id']} crashed")
+        finally:
+            store.complete(job["job_id"])
+            with _running_lock:
+                _running.discard(job["job_id"])
+            logger.info(f"[{lane}] ■ {job['kind']} job {job['job_id']} in {time.perf_counter() - start:.1f}s")
+
+
+def start_worker_threads(stop_event: threading.Event) -> List[threading.Thread]:
+    """Start one thread per lane slot; returns the threads."""
+    # Loads the models and the fixed notes query vectors before the first job
+    from Backend.models.registry import get_registry, WORKER_MODELS
+    from Backend.notes.text.summarizer import get_retrieval_query_embeddings
+    get_registry().warm_up(WORKER_MODELS)
+    get_retrieval_query_embeddings()
+
+    threads = []
+    threading.Thread(target=_heartbeat_loop, name="worker-heartbeat", daemon=True).start()
+    for lane, count in parse_lanes():
+        for i in range(count):
+            t = threading.Thread(target=_lane_loop, args=(lane, stop_event), name=f"worker-{lane}-{i}", daemon=True)
+            t.start()
+            threads.append(t)
+    logger.info(f"✅ Worker started with lanes: {WORKER_LANES}")
+    return threads
+
+
+def drain_worker_threads(stop_event: threading.Event, threads: List[threading.Thread], timeout: float = WORKER_DRAIN_SECONDS):
+    """
+    Stop claiming, give running jobs up to timeout to finish, then hand the
+    unfinished ones back to the queue so another worker picks them up right away.
+    """
+    stop_event.set()
+    deadline = time.monotonic() + timeout
+    for t in threads:
+        t.join(max(0.0, deadline - time.monotonic()))
+    with _running_lock:
+        unfinished = list(_running)
+    store = get_job_store()
+    for job_id in unfinished:
+        try:
+            store.unclaim(job_id)
+        except Exception:
+            logger.exception(f"Failed to hand job {job_id} back to the queue")
+    logger.info(f"🛑 Worker stopped ({len(unfinished)} unfinished jobs handed back to the queue)")
+
+
+def run_worker(stop_signal=None):
+    """
+    Blocking worker entry point. Drains on SIGTERM, Ctrl+C, or when stop_signal
+    (a multiprocessing.Event, set by the API that spawned this worker) is set.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    threads = start_worker_threads(stop_event)
+    try:
+        while any(t.is_alive() for t in threads) and not stop_event.is_set():
+            if stop_signal is not None and stop_signal.is_set():
+                break
+            stop_event.wait(1)
+    except KeyboardInterrupt:
+        pass
+    drain_worker_threads(stop_event, threads)
+
+
+def _acquire_worker_lock():
+    """Non-blocking exclusive lock on WORKER_LOCK_PATH; the open file, or None if another process holds it."""
+    os.makedirs(os.path.dirname(os.path.abspath(WORKER_LOCK_PATH)), exist_ok=True)
+    lock_file = open(WORKER_LOCK_PATH, "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+class EmbeddedWorker:
+    """Handle on what start_embedded_worker started: a worker process or in-process threads."""
+
+    def __init__(self, process=None, lock_file=None, stop_event=None, threads: Optional[List[threading.Thread]] = None):
+        self.process = process
+        self.lock_file = lock_file  # held for the worker's lifetime (released by the OS if we die)
+        self.stop_event = stop_event  # threading.Event for threads, multiprocessing.Event for the process
+        self.threads = threads or []
+
+
+def start_embedded_worker() -> Optional[EmbeddedWorker]:
+    """
+    Start the worker alongside the API (JOB_EXECUTOR=embedded).
+
+    With the in-memory job store the queue only exists in this process, so worker
+    threads run inside it. Otherwise the API process that gets the worker lock
+    spawns the worker process. Returns None for external workers, or when
+    another API process already owns the worker.
+    """
+    if JOB_EXECUTOR != "embedded":
+        return None
+
+    if JOB_STORE_BACKEND == "memory":
+        logger.warning("⚠️ In-memory job store: running worker threads inside the API process")
+        stop_event = threading.Event()
+        threads = start_worker_threads(stop_event)
+        return EmbeddedWorker(stop_event=stop_event, threads=threads)
+
+    lock_file = _acquire_worker_lock()
+    if lock_file is None:
+        logger.info(f"Job worker is owned by another API process ({WORKER_LOCK_PATH})")
+        return None
+
+    context = multiprocessing.get_context("spawn")
+    stop_signal = context.Event()
+    process = context.Process(target=run_worker, args=(stop_signal,), name="job-worker", daemon=True)
+    process.start()
+    logger.info(f"✅ Job worker process started (pid {process.pid})")
+    return EmbeddedWorker(process=process, lock_file=lock_file, stop_event=stop_signal)
+
+
+def stop_embedded_worker(handle: Optional[EmbeddedWorker]) -> None:
+    """Drain the worker (see drain_worker_threads); a worker process still alive after that is terminated."""
+    if handle is None:
+        return
+    if handle.process is None:
+        drain_worker_threads(handle.stop_event, handle.threads)
+        return
+    handle.stop_event.set()
+    handle.process.join(timeout=WORKER_DRAIN_SECONDS + 10)
+    if handle.process.is_alive():
+        logger.warning("⚠️ Job worker did not stop in time, terminating it")
+        handle.process.terminate()
+        handle.process.join(timeout=10)
+    if handle.lock_file is not None:
+        handle.lock_file.close()
+
+
+if __name__ == "__main__":
+    run_worker()
@@ -0,0 +1,41 @@
+"""
+Per-stage concurrency limits for the ingestion pipeline.
+
+Every job thread runs the same pipeline (download -> parse -> LLM -> embed),
+but the stages stress different resources. Each stage gets its own semaphore
+so e.g. two papers can download while only one runs hi_res partitioning.
+"""
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+from Backend.workers.progress import record_wait
+
+STAGE_LIMITS = {
+    "download": int(os.getenv("STAGE_LIMIT_DOWNLOAD", "4")),
+    "parse": int(os.getenv("STAGE_LIMIT_PARSE", "1")),   # partition_pdf hi_res is CPU / memory bound
+    "llm": int(os.getenv("STAGE_LIMIT_LLM", "2")),        # Groq calls, already rate limited per call
+    "embed": int(os.getenv("STAGE_LIMIT_EMBED", "1")),    # local ONNX models use every core
+}
+
+_semaphores = {name: threading.BoundedSemaphore(max(1, limit)) for name, limit in STAGE_LIMITS.items()}
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Hold a slot of the named stage for the duration of the block.
+    Stages must not be nested (the semaphores are not reentrant).
+    Time spent waiting for the slot is recorded, so saturated stages show up in /metrics.
+    """
+    semaphore = _semaphores.get(name)
+    if semaphore is None:
+        raise ValueError(f"Unknown pipeline stage: {name}")
+    start = time.perf_counter()
+    semaphore.acquire()
+    record_wait(name, time.perf_counter() - start)
+    try:
+        yield
+    finally:
+        semaphore.release()
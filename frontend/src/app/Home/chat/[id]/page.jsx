@@ -1,6 +1,6 @@
 "use client";
 
-import { getChatStatus, sendChatMessage, startChatJob } from "@/lib/api_call";
+import { subscribeJobEvents, sendChatMessage, startChatJob } from "@/lib/api_call";
 import { useParams, useSearchParams } from "next/navigation";
 import { useEffect, useState, useRef } from "react";
 import { Send, Loader2, Paperclip, ChevronLeft, Maximize2, MoreHorizontal, Bot } from "lucide-react";
@@ -35,8 +35,8 @@ export default function ChatPage() {
 
   useEffect(() => {
     if (!chatId) return;
-    const interval = setInterval(async () => {
-      const data = await getChatStatus(chatId);
+    // Preparation status is pushed over SSE; no polling
+    return subscribeJobEvents(chatId, (data) => {
       if (data.status === "done") {
         setLoadingChat(false);
         // Save chat session to history
@@ -45,10 +45,8 @@ export default function ChatPage() {
           title: sessionStorage.getItem(`title:${id}`) || "Untitled Paper",
           chatId
         });
-        clearInterval(interval);
       }
-    }, 3000);
-    return () => clearInterval(interval);
+    });
   }, [chatId]);
 
   function saveChatIndex({ id, title, chatId }) {
@@ -115,9 +113,21 @@ export default function ChatPage() {
     setQuery("");
     setSending(true);
 
+    // The assistant message appears with the first token and grows as the answer streams in
+    let streaming = false;
+    const showAnswer = (content) => {
+      const replaceLast = streaming; // read now: the updater below runs later
+      streaming = true;
+      setMessages((prev) =>
+        replaceLast
+          ? [...prev.slice(0, -1), { role: "assistant", content }]
+          : [...prev, { role: "assistant", content }]
+      );
+    };
+
     try {
-      const res = await sendChatMessage(chatId, textToSend);
-      setMessages((prev) => [...prev, { role: "assistant", content: res.answer }]);
+      const res = await sendChatMessage(chatId, textToSend, showAnswer);
+      showAnswer(res.answer);
     } catch (error) {
       console.error("Chat error:", error);
       setMessages((prev) => [
@@ -3,7 +3,7 @@
 import { useState, useEffect, useRef } from "react";
 import { Download, User, Calendar, ArrowLeft, ExternalLink, Search, ChevronDown, ChevronUp, Maximize2, X, FileText } from "lucide-react";
 
-import { startNotesJob, getJobStatus } from "@/lib/api_call";
+import { startNotesJob, subscribeJobEvents } from "@/lib/api_call";
 import { useParams } from "next/navigation";
 import { getNotes } from "@/lib/api_call";
 import { useRouter } from "next/navigation";
@@ -148,42 +148,37 @@ export default function NotePage() {
     localStorage.setItem("notesIndex", JSON.stringify(notes))
 
   }
-  //----Poll Job : Getting Notes----
+  //----Job updates : Getting Notes (pushed over SSE)----
 
   useEffect(() => {
     if (!jobId || !isMountedRef.current) return
-    const interval = setInterval(async () => {
-      try {
-        const data = await getJobStatus(jobId)
+    const unsubscribe = subscribeJobEvents(
+      jobId,
+      (data) => {
+        if (!isMountedRef.current) return
         if (data.status === "done") {
-          if (isMountedRef.current) {
-            setNote(data.result)
-            setLoading(false)
-            const title = data.result?.papermetadata?.title || "Untitled Paper";
-            sessionStorage.setItem(`title:${id}`, title);
-            saveNoteIndex({
-              id,
-              title: title,
-            })
-          }
-          clearInterval(interval)
+          setNote(data.result)
+          setLoading(false)
+          const title = data.result?.papermetadata?.title || "Untitled Paper";
+          sessionStorage.setItem(`title:${id}`, title);
+          saveNoteIndex({
+            id,
+            title: title,
+          })
         }
-        if (data.status === "error") {
-          if (isMountedRef.current) {
-            setError(data.error || "Job Failed")
-            setLoading(false)
-          }
-          clearInterval(interval)
+        if (data.status === "error" || data.status === "not_found") {
+          setError(data.error || "Job Failed")
+          setLoading(false)
         }
-      } catch (err) {
+      },
+      (err) => {
         if (isMountedRef.current) {
           setError(err.message)
           setLoading(false)
         }
-        clearInterval(interval)
       }
-    }, 3000)
-    return () => clearInterval(interval)
+    )
+    return unsubscribe
   }, [jobId])
   //-------Download handler------
   const toggleVisual = (index) => {
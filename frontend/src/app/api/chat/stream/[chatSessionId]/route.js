@@ -10,16 +10,22 @@ export async function POST(req, { params }) {
         "Content-Type": "application/json",
       },
       body: JSON.stringify({ message: body.message }),
+      signal: req.signal,
     }
   );
 
-  if (!response.ok) {
+  if (!response.ok || !response.body) {
     const errText = await response.text();
     return new Response(errText, { status: 500 });
   }
 
-  const text = await response.text(); // 👈 IMPORTANT
-  return new Response(text, {
-    headers: { "Content-Type": "text/plain" },
-  });
+  // Pass tokens through as they arrive (buffering here would hide the first token)
+  const headers = {
+    "Content-Type": "text/plain; charset=utf-8",
+    "Cache-Control": "no-cache",
+  };
+  const serverTiming = response.headers.get("Server-Timing");
+  if (serverTiming) headers["Server-Timing"] = serverTiming;
+
+  return new Response(response.body, { headers });
 }
@@ -0,0 +1,25 @@
+// . /api/jobs/events/[jobId]/
+// Proxies the backend's Server-Sent Events stream for a notes or chat job.
+
+export async function GET(req, { params }) {
+  const { jobId } = await params;
+
+  const res = await fetch(`http://localhost:8000/job-events/${jobId}`, {
+    signal: req.signal,
+  });
+
+  if (!res.ok || !res.body) {
+    return Response.json(
+      { error: "Failed to open job events" },
+      { status: 500 }
+    );
+  }
+
+  return new Response(res.body, {
+    headers: {
+      "Content-Type": "text/event-stream",
+      "Cache-Control": "no-cache",
+      Connection: "keep-alive",
+    },
+  });
+}
@@ -63,6 +63,31 @@ export async function getJobStatus(jobId) {
 }
 
 
+// Subscribe to pushed job updates (notes or chat) instead of polling.
+// onUpdate receives every state ({ status, progress, result, error });
+// the stream closes itself after "done" / "error". Returns an unsubscribe function.
+export function subscribeJobEvents(jobId, onUpdate, onError) {
+  const source = new EventSource(`/api/jobs/events/${jobId}`);
+
+  source.onmessage = (event) => {
+    const data = JSON.parse(event.data);
+    onUpdate(data);
+    if (["done", "error", "not_found"].includes(data.status)) {
+      source.close();
+    }
+  };
+
+  source.onerror = () => {
+    // EventSource reconnects on its own; only report if it gave up
+    if (source.readyState === EventSource.CLOSED && onError) {
+      onError(new Error("Lost connection to job updates"));
+    }
+  };
+
+  return () => source.close();
+}
+
+
 // ---------------------------------
 // CHAT
 // ---------------------------------
@@ -96,8 +121,8 @@ export async function getChatStatus(chatSessionId) {
   return res.json(); // { status, pdf_id }
 }
 
-// 3️⃣ Send chat message (non-streaming for now)
-export async function sendChatMessage(chatSessionId, message) {
+// 3️⃣ Send chat message; onToken(answerSoFar) is called as the answer streams in
+export async function sendChatMessage(chatSessionId, message, onToken) {
   const res = await fetch(`/api/chat/stream/${chatSessionId}`, {
     method: "POST",
     headers: {
@@ -111,6 +136,15 @@ export async function sendChatMessage(chatSessionId, message) {
     throw new Error(err || "Failed to send chat message");
   }
 
-  const text = await res.text(); // 👈 IMPORTANT
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let text = "";
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    text += decoder.decode(value, { stream: true });
+    onToken?.(text);
+  }
+  text += decoder.decode();
   return { answer: text };
 }